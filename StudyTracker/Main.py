@@ -3,14 +3,53 @@ from tkinter import ttk, messagebox
 from datetime import datetime
 from data_manager import DataManager
 from progress_calc import ProgressCalculator
-from subject_window import SubjectWindow
+from analytics import StudyAnalytics
+from subject_window import ModernSidebar, SubjectWindow
 from add_dialog import AddDialog
 from font_manager import FontManager
+from theme import define_app_styles
 from tkinter import PhotoImage
-from PIL import Image, ImageTk
+from assets import AssetCache
 import os
 import sys
 from spotify_player import SpotifyPlayer
+from tick_scheduler import TickScheduler
+from view_manager import ViewManager
+from virtual_list import VirtualList
+
+
+class SubjectRow(ttk.Frame):
+    """
+    One recycled row of the main menu's subject list
+    """
+
+    def __init__(self, parent, open_callback, delete_callback):
+        super().__init__(parent)
+        self.subject = None
+
+        # Create a frame for the button and delete button
+        button_frame = ttk.Frame(self)
+        button_frame.pack(fill="x", expand=True, padx=5)
+
+        self.button = ttk.Button(
+            button_frame,
+            command=lambda: open_callback(self.subject),
+            style="Subject.TButton"  # Added style for consistency
+        )
+        self.button.pack(side="left", fill="x", expand=True)
+
+        delete_btn = ttk.Button(
+            button_frame,
+            text="X",
+            command=lambda: delete_callback(self.subject),
+            width=3,
+            style="Delete.TButton"
+        )
+        delete_btn.pack(side="right", padx=(5, 0))
+
+    def show(self, subject, completion):
+        self.subject = subject
+        self.button.configure(text=f"{subject} ({completion} Complete)")
 
 
 class StudyTrackerApp:
@@ -23,20 +62,54 @@ class StudyTrackerApp:
         # Initialize FontManager
         self.font_manager = FontManager()
 
-        # Configure styles with custom font
-        self.font_manager.configure_styles()
+        # Every ttk style is defined once, here
+        define_app_styles()
 
         # Center the window
         self.center_window()
 
-        self.data_manager = DataManager()
+        # The backend follows the file extension: .json or a binary .stb/.stbz/.stbx
+        # snapshot (journaled), .db for SQLite or a .shards directory per subject.
+        # Writes happen behind the UI on a worker thread and are flushed on close.
+        # Completion changes are also logged with timestamps to a .events file.
+        self.data_manager = DataManager(
+            os.getenv("STUDY_DATA_FILE", "study_data.json"),
+            journal=True,
+            write_behind=True,
+            history=True
+        )
         self.progress_calculator = ProgressCalculator(self.data_manager)
+        self.analytics = StudyAnalytics(self.data_manager)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # Shared ticker for the clock
+        self.scheduler = TickScheduler.for_widget(self.root)
 
         # Initialize the Spotify player
         self.spotify_player = SpotifyPlayer()
 
         self.setup_ui()
 
+        # Screens are built once and swapped, with a few subject windows kept around
+        self.views = ViewManager(self.data_manager, max_subject_views=3)
+        # One subject sidebar shared by every subject window, built on first use
+        self.subject_sidebar = None
+        self.views.show("main", lambda: self)
+
+    @property
+    def container(self):
+        return self.main_container
+
+    def refresh(self):
+        self.refresh_subject_list()
+
+    def on_show(self):
+        self.scheduler.resume("clock")
+
+    def on_hide(self):
+        # No clock ticks while the main menu is hidden
+        self.scheduler.pause("clock")
+
     def setup_ui(self):
         # Main container with sidebar
         self.main_container = ttk.Frame(self.root)
@@ -51,13 +124,6 @@ class StudyTrackerApp:
         self.content_frame = ttk.Frame(self.main_container, style="Content.TFrame")
         self.content_frame.pack(side="left", fill="both", expand=True, padx=20, pady=20)
 
-        # Configure styles for the content frame
-        style = ttk.Style()
-        style.configure(
-            "Content.TFrame",
-            background="#D2DCE5"  # Light blue-gray
-        )
-
         # Create a frame for the top buttons
         self.top_buttons_frame = ttk.Frame(self.content_frame, style="Content.TFrame")
         self.top_buttons_frame.pack(fill="x", pady=(0, 20))  # Add some space below the buttons
@@ -72,22 +138,20 @@ class StudyTrackerApp:
         )
         self.clock_canvas.pack(pady=20)
 
-        # Load and display the image using Pillow (for .jpeg support)
-        self.clock_bg_image = Image.open("clock_bg.jpeg")  # Open JPEG image using Pillow
-        self.clock_bg_image = self.clock_bg_image.resize((500, 200))  # Resize if needed
-        self.clock_bg_image = ImageTk.PhotoImage(self.clock_bg_image)  # Convert to Tkinter-compatible format
+        # Decoded and resized once, then shared from the asset cache
+        self.clock_bg_image = AssetCache().photo("clock_bg.jpeg", (500, 200))
 
         self.clock_canvas.create_image(0, 0, anchor="nw", image=self.clock_bg_image)
 
         # Clock in the center of the canvas
         self.clock_label = tk.Label(
             self.clock_canvas,
-            font=("Helvetica", 48),
+            font=(self.font_manager.get_font(), 48),
             foreground="#483C32",  # Dark taupe
             background="#D2DCE5"  # Ensure transparency with the canvas
         )
         self.clock_label.place(relx=0.5, rely=0.5, anchor="center")  # Center the clock label
-        self.update_clock()
+        self.start_clock()
 
         # Study tracker content
         self.study_tracker_frame = ttk.Frame(self.content_frame, style="Content.TFrame")
@@ -95,22 +159,7 @@ class StudyTrackerApp:
         self.setup_study_tracker()
 
         # Load headset icon
-        self.headset_icon = Image.open("headset_icon.png")  # Path to headset icon
-        self.headset_icon = self.headset_icon.resize((40, 40))  # Resize icon
-        self.headset_icon = ImageTk.PhotoImage(self.headset_icon)
-
-        # Load headset icon
-        self.headset_icon = Image.open("headset_icon.png")
-        self.headset_icon = self.headset_icon.resize((30, 30))  # Made icon slightly smaller
-        self.headset_icon = ImageTk.PhotoImage(self.headset_icon)
-
-        # Style for the Spotify connect button
-        style.configure(
-            "Spotify.TButton",
-            padding=5,
-            font=(self.font_manager.get_font(), 10),
-            background="#1DB954",  # Spotify green
-        )
+        self.headset_icon = AssetCache().photo("headset_icon.png", (30, 30))
 
         # Headset Button (top left)
         self.headset_button = ttk.Button(
@@ -156,14 +205,6 @@ class StudyTrackerApp:
             self.playback_frame = ttk.Frame(self.top_buttons_frame, style="Content.TFrame")
             self.playback_frame.pack(side="right", padx=(0, 10))
 
-            # Style for the playback buttons
-            style = ttk.Style()
-            style.configure(
-                "Playback.TButton",
-                padding=5,
-                font=(self.font_manager.get_font(), 10),
-            )
-
             # Add preset album button first
             preset_album_button = ttk.Button(
                 self.playback_frame,
@@ -212,26 +253,6 @@ class StudyTrackerApp:
             background="#493428"  # Dark brown for background
         ).pack(pady=20)
 
-        # Configure sidebar style
-        style = ttk.Style()
-        style.configure(
-            "Sidebar.TFrame",
-            background="#493428"  # Dark brown
-        )
-        style.configure(
-            "Sidebar.TButton",
-            padding=10,
-            font=(self.font_manager.get_font(), 11, "bold"),  # Changed this line
-            background="#BE8464",  # Light brown
-            foreground="#483C32",  # Dark taupe
-        )
-        style.configure(
-            "Sidebar.TLabel",
-            background="#493428",  # Dark brown
-            foreground="#D2DCE5",  # Light blue-gray
-            font=(self.font_manager.get_font(), 14, "bold")  # Changed this line
-        )
-
         # Apply the sidebar frame style
         self.sidebar.configure(style="Sidebar.TFrame")
 
@@ -256,17 +277,24 @@ class StudyTrackerApp:
         # Optional: Configure sidebar background
         self.sidebar.configure(style="Sidebar.TFrame")
 
-    def update_clock(self):
-        if self.clock_label.winfo_exists():
-            now = datetime.now().strftime("%H:%M:%S")
-            self.clock_label.config(
-                text=now,
-                font=(self.font_manager.get_font(), 48),
-                foreground="#483C32",  # Dark taupe for text
-            )
-            self.root.after(1000, self.update_clock)
+    def start_clock(self):
+        # Re-subscribing replaces the previous clock, so chains never pile up
+        self.scheduler.subscribe(
+            "clock",
+            lambda: datetime.now().strftime("%H:%M:%S"),
+            lambda now: self.clock_label.config(text=now)
+        )
 
     def setup_study_tracker(self):
+        # Overall progress across every subject
+        self.overall_progress_label = ttk.Label(
+            self.study_tracker_frame,
+            font=(self.font_manager.get_font(), 12, "bold"),
+            foreground="#483C32",
+            background="#D2DCE5"
+        )
+        self.overall_progress_label.pack(pady=(0, 10))
+
         # Create a frame for the list
         self.list_frame = ttk.Frame(self.study_tracker_frame)
         self.list_frame.pack(fill="both", expand=True)
@@ -287,9 +315,10 @@ class StudyTrackerApp:
             widget.destroy()
 
         # Recreate clock label
-        self.clock_label = ttk.Label(self.content_frame, font=("Helvetica", 48), anchor="center")
+        self.clock_label = ttk.Label(self.content_frame, font=(self.font_manager.get_font(), 48),
+                                     foreground="#483C32", anchor="center")
         self.clock_label.pack(pady=20)
-        self.update_clock()
+        self.start_clock()
 
         # Rebuild the study tracker UI
         self.study_tracker_frame = ttk.Frame(self.content_frame)
@@ -301,108 +330,35 @@ class StudyTrackerApp:
         for widget in self.list_frame.winfo_children():
             widget.destroy()
 
-        # Create outer frame to manage boundaries
-        self.outer_frame = ttk.Frame(self.list_frame)
-        self.outer_frame.pack(fill="both", expand=True)
-
-        # Subjects list with scrollbar
-        self.canvas = tk.Canvas(self.outer_frame, bg="#f0f0f0", highlightthickness=0)
-        scrollbar = ttk.Scrollbar(self.outer_frame, orient="vertical", command=self.canvas.yview)
-        self.scrollable_frame = ttk.Frame(self.canvas)
-
-        # Configure scrolling behavior
-        def _on_frame_configure(event):
-            # Update the scrollregion to match the frame's actual size
-            self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-            # Get the visible height of the canvas
-            visible_height = self.canvas.winfo_height()
-            # Get the total height of the content
-            total_height = self.scrollable_frame.winfo_reqheight()
-
-            if total_height > visible_height:
-                # Only show scrollbar when content exceeds visible area
-                scrollbar.pack(side="right", fill="y")
-                self.canvas.bind_all("<MouseWheel>", _on_mousewheel)
-            else:
-                # Hide scrollbar when all content is visible
-                scrollbar.pack_forget()
-                self.canvas.unbind_all("<MouseWheel>")
-
-        def _on_mousewheel(event):
-            # Get current scroll position
-            current_pos = self.canvas.yview()
-
-            # Calculate scroll direction
-            if event.delta > 0:  # Scrolling up
-                if current_pos[0] <= 0:  # At the top
-                    return
-            else:  # Scrolling down
-                if current_pos[1] >= 1:  # At the bottom
-                    return
-
-            self.canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
-
-        def _on_canvas_configure(event):
-            # Update the width of the scrollable frame when canvas is resized
-            self.canvas.itemconfig(canvas_window, width=event.width)
-
-        # Bind configuration events
-        self.scrollable_frame.bind("<Configure>", _on_frame_configure)
-        self.canvas.bind("<Configure>", _on_canvas_configure)
-
-        # Create the window for the scrollable frame
-        canvas_window = self.canvas.create_window(
-            (0, 0),
-            window=self.scrollable_frame,
-            anchor="nw",
-            tags="self.scrollable_frame"
+        # Only enough rows to fill the view are built; they are rebound to
+        # subjects as the list scrolls
+        self.subject_list = VirtualList(
+            self.list_frame,
+            lambda parent, kind: SubjectRow(parent, self.open_subject_window, self.delete_subject),
+            self.bind_subject_row,
+            key_of=lambda index: self.subject_rows[index][0],
+            spacing=10
         )
+        self.subject_list.pack(fill="both", expand=True)
+        self.refresh_subject_list()
 
-        # Configure canvas and scrollbar
-        self.canvas.configure(yscrollcommand=scrollbar.set)
-        self.canvas.pack(side="left", fill="both", expand=True)
+    def refresh_subject_list(self, changed=None):
+        # Every percentage comes from one pass over the data. Rows are matched
+        # to subjects by name, so only rows for the changed subjects are rebound.
+        completions = self.progress_calculator.calculate_all_completions(include_topics=False)
+        self.subject_rows = [(subject, progress["percentage"]) for subject, progress in completions.items()]
+        self.subject_list.set_count(len(self.subject_rows), changed)
+        self.update_overall_progress()
 
-        # Create subject buttons
-        data = self.data_manager.load_data()
-        for subject in data:
-            self.create_subject_button(subject)
+    def bind_subject_row(self, row, index):
+        row.show(*self.subject_rows[index])
 
-    def create_subject_button(self, subject):
-        frame = ttk.Frame(self.scrollable_frame)
-        frame.pack(fill="x", padx=5, pady=5)
-
-        completion = self.progress_calculator.calculate_subject_completion(subject)
-
-        # Create a frame for the button and delete button
-        button_frame = ttk.Frame(frame)
-        button_frame.pack(fill="x", expand=True)
-
-        button = ttk.Button(
-            button_frame,
-            text=f"{subject} ({completion} Complete)",
-            command=lambda s=subject: self.open_subject_window(s),
-            style="Subject.TButton"  # Added style for consistency
-        )
-        button.pack(side="left", fill="x", expand=True)
-
-        delete_btn = ttk.Button(
-            button_frame,
-            text="X",
-            command=lambda s=subject: self.delete_subject(s),
-            width=3,
-            style="Delete.TButton"
-        )
-        delete_btn.pack(side="right", padx=(5, 0))
+    def update_overall_progress(self):
+        # Memoized alongside the per-subject figures, so this costs no extra pass
+        overall = self.progress_calculator.calculate_overall_completion()
+        self.overall_progress_label.config(text=f"All subjects: {overall}% Complete")
 
     def create_add_button(self):
-        style = ttk.Style()
-        style.configure(
-            "AddButton.TButton",
-            background="#BE8464",  # Light brown
-            foreground="#483C32",  # Dark taupe
-            font=(self.font_manager.get_font(), 14, "bold"),  # Increased font size
-            padding=(10, 5)
-        )
         add_button = ttk.Button(
             self.button_frame,
             text="+ Add Subject",
@@ -418,30 +374,43 @@ class StudyTrackerApp:
         if not subject_name:
             return
 
-        data = self.data_manager.load_data()
-        if subject_name not in data:
-            data[subject_name] = {"topics": {}}
-            self.data_manager.save_data(data)
-            self.create_subject_list()  # This now only updates the list, not the button
+        with self.data_manager.transaction() as txn:
+            added = txn.add_subject(subject_name)
+        if added:
+            self.refresh_subject_list(changed=[subject_name])
+            # Bring the new subject into view, wherever it landed in the list
+            names = [subject for subject, _ in self.subject_rows]
+            if subject_name in names:
+                self.subject_list.scroll_to(names.index(subject_name))
 
     def delete_subject(self, subject):
-        data = self.data_manager.load_data()
-        del data[subject]
-        self.data_manager.save_data(data)
-        self.create_subject_list()
+        with self.data_manager.transaction() as txn:
+            txn.delete_subject(subject)
+        self.views.discard(("subject", subject))
+        self.refresh_subject_list(changed=[])
 
     def open_subject_window(self, subject):
-        # Clear main menu
-        for widget in self.root.winfo_children():
-            widget.destroy()
-
-        # Open subject window
-        SubjectWindow(self.root, subject, self.data_manager, self.progress_calculator, self.return_to_main_menu)
+        if self.subject_sidebar is None:
+            self.subject_sidebar = ModernSidebar(
+                self.root, subject, self.data_manager, self.progress_calculator,
+                self.open_subject_window, self.return_to_main_menu
+            )
+        # Reuses the cached window for this subject when there is one
+        self.views.show(("subject", subject), lambda: SubjectWindow(
+            self.root, subject, self.data_manager, self.progress_calculator, self.return_to_main_menu,
+            self.analytics, self.open_subject_window, sidebar=self.subject_sidebar
+        ))
 
     def return_to_main_menu(self):
-        for widget in self.root.winfo_children():
-            widget.destroy()
-        self.setup_ui()
+        self.views.show("main", lambda: self)
+
+    def on_close(self):
+        # Make sure queued writes reach the disk before the window goes away
+        try:
+            self.data_manager.close()
+        except Exception as e:
+            messagebox.showerror("Save Error", f"Your latest changes could not be saved:\n{e}")
+        self.root.destroy()
 
     def center_window(self):
         self.root.update_idletasks()
@@ -1,11 +1,9 @@
 import tkinter as tk
 from tkinter import ttk
-from font_manager import FontManager
+from theme import define_app_styles
 
 class AddDialog:
     def __init__(self, title, prompt, callback):
-        # Get font manager instance
-        self.font_manager = FontManager()
         self.dialog = tk.Toplevel()
         self.dialog.title(title)
         self.dialog.geometry("400x250")
@@ -23,7 +21,7 @@ class AddDialog:
         self.main_frame = ttk.Frame(self.dialog, style="Dialog.TFrame")
         self.main_frame.pack(fill="both", expand=True, padx=20, pady=20)
 
-        self.setup_styles()
+        define_app_styles()
 
         # Create prompt label
         ttk.Label(
@@ -63,40 +61,6 @@ class AddDialog:
         y = (self.dialog.winfo_screenheight() // 2) - (height // 2)
         self.dialog.geometry(f"{width}x{height}+{x}+{y}")
 
-    def setup_styles(self):
-        style = ttk.Style()
-
-        # Dialog frame style
-        style.configure(
-            "Dialog.TFrame",
-            background="#D2DCE5"  # Light blue-gray
-        )
-
-        # Dialog label style
-        style.configure(
-            "Dialog.TLabel",
-            background="#D2DCE5",  # Light blue-gray
-            foreground="#483C32",  # Dark taupe
-            font=(self.font_manager.get_font(), 12)
-        )
-
-        # Entry style
-        style.configure(
-            "Dialog.TEntry",
-            fieldbackground="#D2DCE5",  # Light blue-gray
-            padding=5,
-            font=(self.font_manager.get_font(), 10)
-        )
-
-        # Button styles
-        style.configure(
-            "Dialog.TButton",
-            padding=(20, 10),
-            background="#BE8464",  # Light brown
-            foreground="#483C32",  # Dark taupe
-            font=(self.font_manager.get_font(), 10)
-        )
-
     def create_buttons(self, button_frame):
         # Cancel button
         cancel_btn = ttk.Button(
@@ -0,0 +1,192 @@
+"""
+Study analytics computed from the completion event log (see event_log.py):
+daily completion counts, rolling velocity, streaks and a projected finish
+date per subject. All of it is vectorized over the log's column arrays.
+"""
+import math
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from event_log import _U32
+
+SECONDS_PER_DAY = 86400
+
+
+def _take(values, dtype, positions):
+    # Fancy indexing copies, so no buffer of the growing array.array is kept alive
+    return np.frombuffer(values, dtype=dtype)[positions]
+
+
+def _utc_offset(timestamp):
+    # Seconds ahead of UTC that local time was at timestamp
+    return datetime.fromtimestamp(timestamp).astimezone().utcoffset().total_seconds()
+
+
+def _local_days(times):
+    """
+    Day numbers (days since the epoch) in local time, each timestamp using
+    the UTC offset in effect at that moment, so events from before a DST
+    switch keep their own day
+    """
+    if not len(times):
+        return np.zeros(0, dtype=np.int64)
+    # Offsets are looked up once per distinct UTC day, at both of its ends
+    utc_days, inverse = np.unique(np.floor(times / SECONDS_PER_DAY), return_inverse=True)
+    starts = utc_days * SECONDS_PER_DAY
+    start_offsets = np.array([_utc_offset(t) for t in starts.tolist()])
+    end_offsets = np.array([_utc_offset(t) for t in (starts + SECONDS_PER_DAY - 1).tolist()])
+    offsets = start_offsets[inverse]
+
+    switched = (start_offsets != end_offsets)[inverse]
+    if switched.any():
+        # The offset changed during these days; zones switch on quarter hours
+        quarters, quarter_inverse = np.unique(np.floor(times[switched] / 900) * 900, return_inverse=True)
+        offsets[switched] = np.array([_utc_offset(t) for t in quarters.tolist()])[quarter_inverse]
+    return np.floor((times + offsets) / SECONDS_PER_DAY).astype(np.int64)
+
+
+def _today():
+    return (date.today() - date(1970, 1, 1)).days
+
+
+class _SubjectHistory:
+    """
+    Per-day totals for one subject, folded in from the event log as new
+    events arrive
+    """
+    __slots__ = ("first_day", "completions", "net", "events")
+
+    def __init__(self):
+        self.first_day = None
+        self.completions = np.zeros(0, dtype=np.int64)
+        self.net = np.zeros(0, dtype=np.int64)
+        self.events = 0
+
+    def fold(self, days, completed):
+        if not len(days):
+            return
+        low = int(days.min())
+        if self.first_day is None:
+            self.first_day = low
+        elif low < self.first_day:
+            # Earlier than anything seen so far, e.g. after a time zone change:
+            # move the origin back
+            padding = np.zeros(self.first_day - low, dtype=np.int64)
+            self.completions = np.concatenate([padding, self.completions])
+            self.net = np.concatenate([padding, self.net])
+            self.first_day = low
+        offsets = days - self.first_day
+        size = max(len(self.net), int(offsets.max()) + 1)
+        self.completions = self._grow(self.completions, size)
+        self.net = self._grow(self.net, size)
+        self.completions += np.bincount(offsets, weights=completed, minlength=size).astype(np.int64)
+        self.net += np.bincount(offsets, weights=completed * 2 - 1, minlength=size).astype(np.int64)
+        self.events += len(days)
+
+    @staticmethod
+    def _grow(values, size):
+        if len(values) >= size:
+            return values
+        return np.concatenate([values, np.zeros(size - len(values), dtype=values.dtype)])
+
+    def until(self, day):
+        """
+        Return (completions, net) per day from first_day through day
+        """
+        size = day - self.first_day + 1
+        if size <= 0:
+            return self.completions[:0], self.net[:0]
+        return self._grow(self.completions, size)[:size], self._grow(self.net, size)[:size]
+
+
+class StudyAnalytics:
+    def __init__(self, data_manager, window=7):
+        self.data_manager = data_manager
+        self.history = data_manager.history
+        self.window = window
+
+        # Day totals per subject, updated from the new tail of the log only
+        self._subjects = {}
+        # Last summary per subject with the (event count, day) it was computed for
+        self._summaries = {}
+
+    def _subject_history(self, subject):
+        cached = self._subjects.get(subject)
+        if cached is None:
+            cached = self._subjects[subject] = _SubjectHistory()
+
+        positions = self.history.span(subject)
+        if len(positions) > cached.events:
+            # Only fold in events logged since the last call
+            new = np.frombuffer(positions, dtype=np.dtype(_U32))[cached.events:].copy()
+            times = _take(self.history.times, np.float64, new)
+            completed = _take(self.history.completed, np.int8, new).astype(np.int64)
+            cached.fold(_local_days(times), completed)
+        return cached
+
+    def daily_counts(self, subject, days=None):
+        """
+        Return (first day, completions per day) up to today, optionally only
+        the last days entries
+        """
+        history = self._subject_history(subject)
+        if history.first_day is None:
+            return date.today(), np.zeros(0, dtype=np.int64)
+        completions, _ = history.until(_today())
+        first_day = history.first_day
+        if days is not None and len(completions) > days:
+            first_day += len(completions) - days
+            completions = completions[-days:]
+        return date(1970, 1, 1) + timedelta(days=first_day), completions
+
+    def summary(self, subject):
+        """
+        Return {"velocity", "current_streak", "longest_streak", "remaining",
+        "forecast"} for subject. velocity is net subtopics completed per day
+        over the rolling window; forecast is the projected finish date, or
+        None when there is no positive velocity to project from.
+        """
+        history = self._subject_history(subject)
+        today = _today()
+        key = (history.events, today)
+        cached = self._summaries.get(subject)
+        if cached is not None and cached[0] == key:
+            summary = dict(cached[1])
+        else:
+            summary = self._summarize(history, today)
+            self._summaries[subject] = (key, summary)
+            summary = dict(summary)
+
+        # Remaining work comes from the live counters, not the log
+        completed, total = self.data_manager.count_completed(subject)
+        summary["remaining"] = remaining = total - completed
+        summary["forecast"] = None
+        if remaining <= 0:
+            summary["forecast"] = date.today()
+        elif summary["velocity"] > 0:
+            summary["forecast"] = date.today() + timedelta(days=math.ceil(remaining / summary["velocity"]))
+        return summary
+
+    def _summarize(self, history, today):
+        if history.first_day is None:
+            return {"velocity": 0.0, "current_streak": 0, "longest_streak": 0}
+        completions, net = history.until(today)
+
+        # Rolling mean of net completions over the last window days
+        padded = np.concatenate([np.zeros(self.window, dtype=np.int64), net])
+        rolling = (np.cumsum(padded)[self.window:] - np.cumsum(padded)[:-self.window]) / self.window
+        velocity = float(rolling[-1]) if len(rolling) else 0.0
+
+        # Streaks are runs of days with at least one completion
+        active = np.concatenate([[False], completions > 0, [False]])
+        edges = np.flatnonzero(np.diff(active.astype(np.int8)))
+        runs = edges[1::2] - edges[::2]
+        longest = int(runs.max()) if len(runs) else 0
+        current = 0
+        if len(runs):
+            # A streak stays current until a whole day passes without completions
+            last_end = edges[-1]
+            if last_end >= len(completions) - 1:
+                current = int(runs[-1])
+        return {"velocity": max(velocity, 0.0), "current_streak": current, "longest_streak": longest}
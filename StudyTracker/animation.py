@@ -0,0 +1,115 @@
+"""
+Small animation engine for Tk widgets.
+
+Every running animation on a Tk root is advanced by one shared, frame-capped
+tick. An animation runs for a fixed duration, is eased, and stops on its own
+when it finishes, when it is cancelled, when its widget is destroyed or when
+another animation is started on the same widget with the same key.
+"""
+import time
+import tkinter as tk
+
+
+def linear(t):
+    return t
+
+
+def ease_out_cubic(t):
+    return 1 - (1 - t) ** 3
+
+
+def ease_in_out_quad(t):
+    return 2 * t * t if t < 0.5 else 1 - (-2 * t + 2) ** 2 / 2
+
+
+class Animation:
+    __slots__ = ("widget", "key", "duration", "step", "easing", "on_done", "started", "cancelled")
+
+    def __init__(self, widget, key, duration, step, easing, on_done):
+        self.widget = widget
+        self.key = key
+        self.duration = duration
+        self.step = step
+        self.easing = easing
+        self.on_done = on_done
+        self.started = time.monotonic()
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class Animator:
+    """
+    One per Tk root, see Animator.for_widget()
+    """
+    _instances = {}
+
+    @classmethod
+    def for_widget(cls, widget):
+        root = widget._root()
+        animator = cls._instances.get(root)
+        if animator is None:
+            animator = cls._instances[root] = cls(root)
+        return animator
+
+    def __init__(self, root, fps=60):
+        self.root = root
+        self.interval = 1 / fps
+        self._animations = []
+        self._keyed = {}
+        self._after_id = None
+
+    def start(self, widget, duration, step, easing=ease_out_cubic, on_done=None, key=None):
+        """
+        Call step(eased progress from 0 to 1) on every frame for duration
+        seconds, then on_done(). Returns the Animation so it can be cancelled.
+        """
+        if key is not None:
+            self.cancel(widget, key)
+        animation = Animation(widget, key, duration, step, easing, on_done)
+        self._animations.append(animation)
+        if key is not None:
+            self._keyed[(widget, key)] = animation
+        if self._after_id is None:
+            self._after_id = self.root.after(1, self._tick)
+        return animation
+
+    def cancel(self, widget, key):
+        animation = self._keyed.pop((widget, key), None)
+        if animation is not None:
+            animation.cancel()
+
+    def _finish(self, animation):
+        self._animations.remove(animation)
+        if animation.key is not None and self._keyed.get((animation.widget, animation.key)) is animation:
+            del self._keyed[(animation.widget, animation.key)]
+
+    def _tick(self):
+        self._after_id = None
+        now = time.monotonic()
+        for animation in list(self._animations):
+            if animation.cancelled or not animation.widget.winfo_exists():
+                self._finish(animation)
+                continue
+
+            progress = 1.0
+            if animation.duration > 0:
+                progress = min(1.0, (now - animation.started) / animation.duration)
+            try:
+                animation.step(animation.easing(progress))
+            except tk.TclError:
+                # The widget went away during this frame
+                self._finish(animation)
+                continue
+
+            if progress >= 1.0:
+                self._finish(animation)
+                if animation.on_done is not None:
+                    animation.on_done()
+
+        if self._animations:
+            # Cap the frame rate, leaving out the time this frame took
+            elapsed = time.monotonic() - now
+            delay = max(1, int((self.interval - elapsed) * 1000))
+            self._after_id = self.root.after(delay, self._tick)
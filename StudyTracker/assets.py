@@ -0,0 +1,93 @@
+import hashlib
+import os
+import sys
+
+from PIL import Image, ImageTk
+
+
+class AssetCache:
+    """
+    Shared image cache. Each image file is only read when a view first asks
+    for it, each size is resized once per run and kept as a PhotoImage, and
+    resized copies are saved to a disk cache keyed on a hash of the source
+    file so later runs skip decoding and resizing the original.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if not cls._instance:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, 'initialized'):
+            if getattr(sys, 'frozen', False):
+                # If running as exe
+                self.application_path = os.path.dirname(sys.executable)
+            else:
+                # If running as script
+                self.application_path = os.path.dirname(os.path.abspath(__file__))
+            self.cache_dir = os.path.join(self.application_path, ".cache", "images")
+
+            self._photos = {}   # (name, size) -> PhotoImage
+            self._sources = {}  # name -> decoded source image
+            self._hashes = {}   # (name, mtime, size in bytes) -> source hash
+            self.initialized = True
+
+    def path(self, name):
+        return os.path.join(self.application_path, name)
+
+    def photo(self, name, size):
+        """
+        Return a PhotoImage of the image file name resized to size (width, height)
+        """
+        key = (name, tuple(size))
+        photo = self._photos.get(key)
+        if photo is None:
+            photo = self._photos[key] = ImageTk.PhotoImage(self.image(name, size))
+        return photo
+
+    def image(self, name, size):
+        """
+        Return a PIL image of name resized to size, from the disk cache when possible
+        """
+        thumbnail = self._thumbnail_path(name, size)
+        if os.path.exists(thumbnail):
+            try:
+                with Image.open(thumbnail) as cached:
+                    cached.load()
+                    return cached.copy()
+            except OSError:
+                pass  # Damaged cache entry, rebuilt below
+
+        image = self.source(name).resize(tuple(size))
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp = f"{thumbnail}.{os.getpid()}.tmp"
+            image.save(temp, format="PNG")
+            os.replace(temp, thumbnail)
+        except OSError as e:
+            print(f"Could not write image cache: {e}")
+        return image
+
+    def source(self, name):
+        image = self._sources.get(name)
+        if image is None:
+            with Image.open(self.path(name)) as opened:
+                opened.load()
+                image = self._sources[name] = opened.copy()
+        return image
+
+    def _thumbnail_path(self, name, size):
+        width, height = size
+        return os.path.join(self.cache_dir, f"{self._source_hash(name)}_{width}x{height}.png")
+
+    def _source_hash(self, name):
+        # Hashing reads the file but skips decoding it; redone only when the file changes
+        stat = os.stat(self.path(name))
+        key = (name, stat.st_mtime_ns, stat.st_size)
+        digest = self._hashes.get(key)
+        if digest is None:
+            with open(self.path(name), "rb") as f:
+                digest = self._hashes[key] = hashlib.sha256(f.read()).hexdigest()[:32]
+        return digest
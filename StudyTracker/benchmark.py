@@ -0,0 +1,88 @@
+"""
+Rough measurements of the study data layer on a synthetic dataset:
+memory of the in-memory model and load time/size of each snapshot format.
+
+    python benchmark.py [subtopics]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from storage import open_storage
+from study_model import document_from_dict
+
+
+def make_dataset(subtopics=100_000, subjects=20, topics_per_subject=50):
+    """
+    Build a study_data.json style dict with the given number of subtopics
+    """
+    per_topic = max(1, subtopics // (subjects * topics_per_subject))
+    data = {}
+    for s in range(subjects):
+        topics = {}
+        for t in range(topics_per_subject):
+            topics[f"Topic {s}.{t}"] = {
+                "subtopics": {
+                    f"Subtopic {s}.{t}.{i}": {"completed": i % 3 == 0}
+                    for i in range(per_topic)
+                }
+            }
+        data[f"Subject {s}"] = {"topics": topics}
+    return data
+
+
+def measure(build):
+    # Memory still allocated once build() returns, in bytes: the size of its result
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def bench_memory(data):
+    # Both sides rebuild from a JSON-ish source so string costs are comparable
+    _, dict_size = measure(lambda: {
+        subject: {"topics": {
+            topic: {"subtopics": {name: {"completed": value["completed"]}
+                                  for name, value in topic_data["subtopics"].items()}}
+            for topic, topic_data in subject_data["topics"].items()}}
+        for subject, subject_data in data.items()})
+    _, model_size = measure(lambda: document_from_dict(data))
+    print(f"nested dicts:  {dict_size / 1024 / 1024:8.2f} MiB")
+    print(f"slotted model: {model_size / 1024 / 1024:8.2f} MiB")
+
+
+def best_time(action, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        action()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_formats(data):
+    # Cold load of each snapshot format through its storage backend
+    document = document_from_dict(data)
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'format':<8}{'size KiB':>12}{'load ms':>12}")
+        for extension in (".json", ".stb", ".stbz", ".stbx"):
+            filename = os.path.join(directory, "study_data" + extension)
+            storage = open_storage(filename, migrate=False)
+            storage.save(document)
+            size = os.path.getsize(filename)
+            elapsed = best_time(storage.load)
+            storage.close()
+            print(f"{extension[1:]:<8}{size / 1024:>12.1f}{elapsed * 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    dataset = make_dataset(count)
+    print(f"{count} subtopics")
+    bench_memory(dataset)
+    bench_formats(dataset)
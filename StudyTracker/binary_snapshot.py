@@ -0,0 +1,173 @@
+"""
+Compact binary snapshot format for study data.
+
+Layout (all integers little-endian u32), optionally compressed as a whole:
+
+    magic "STB1", compression byte
+    string table: count, the byte length of every string, then their
+                  utf-8 bytes back to back
+    subjects:     count, then per subject: name id, topic count,
+                  per topic: name id, subtopic count, subtopic name ids,
+                  one completion byte per subtopic
+    extras:       length, then a JSON object for keys outside the schema
+
+Every name is stored once in the string table, and subtopic names and
+flags are stored as packed runs that load straight into the model's arrays.
+"""
+import json
+import lzma
+import struct
+import sys
+import zlib
+from array import array
+from itertools import accumulate
+
+from study_model import Subject, Topic
+
+MAGIC = b"STB1"
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_LZMA = 2
+
+COMPRESSION_NAMES = {
+    None: COMPRESSION_NONE,
+    "zlib": COMPRESSION_ZLIB,
+    "lzma": COMPRESSION_LZMA,
+}
+
+_U32 = "I" if array("I").itemsize == 4 else "L"
+_u32 = struct.Struct("<I")
+_u32_pair = struct.Struct("<II")
+
+
+def _to_wire(values):
+    if sys.byteorder == "big":
+        values = array(_U32, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_wire(buffer, offset, count):
+    values = array(_U32)
+    values.frombytes(buffer[offset:offset + count * 4])
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def dumps(document, compression=None):
+    """
+    Encode a {name: Subject} document
+    """
+    strings = {}
+
+    def intern_id(name):
+        string_id = strings.get(name)
+        if string_id is None:
+            string_id = strings[name] = len(strings)
+        return string_id
+
+    body = []
+    extras = {}
+    body.append(_u32.pack(len(document)))
+    for subject_name, subject in document.items():
+        body.append(_u32_pair.pack(intern_id(subject_name), len(subject.topics)))
+        if subject.extra:
+            extras.setdefault(subject_name, {})["extra"] = subject.extra
+        for topic_name, topic in subject.topics.items():
+            names, flags = topic.packed()
+            body.append(_u32_pair.pack(intern_id(topic_name), len(names)))
+            body.append(_to_wire(array(_U32, map(intern_id, names))))
+            body.append(flags.tobytes())
+            if topic.extra or topic.subtopic_extra:
+                extras.setdefault(subject_name, {}).setdefault("topics", {})[topic_name] = {
+                    "extra": topic.extra,
+                    "subtopics": topic.subtopic_extra,
+                }
+
+    encoded = [name.encode("utf-8") for name in strings]
+    table = [_u32.pack(len(encoded)), _to_wire(array(_U32, map(len, encoded))), b"".join(encoded)]
+
+    extra_blob = json.dumps(extras).encode("utf-8") if extras else b""
+    payload = b"".join(table + body + [_u32.pack(len(extra_blob)), extra_blob])
+
+    code = COMPRESSION_NAMES[compression]
+    if code == COMPRESSION_ZLIB:
+        payload = zlib.compress(payload, 6)
+    elif code == COMPRESSION_LZMA:
+        payload = lzma.compress(payload)
+    return MAGIC + bytes([code]) + payload
+
+
+def loads(buffer):
+    """
+    Decode a snapshot into a {name: Subject} document
+    """
+    if buffer[:4] != MAGIC:
+        raise ValueError("Not a study data snapshot")
+    code = buffer[4]
+    payload = memoryview(buffer)[5:]
+    if code == COMPRESSION_ZLIB:
+        payload = memoryview(zlib.decompress(payload))
+    elif code == COMPRESSION_LZMA:
+        payload = memoryview(lzma.decompress(payload))
+    elif code != COMPRESSION_NONE:
+        raise ValueError(f"Unknown snapshot compression: {code}")
+
+    (count,) = _u32.unpack_from(payload, 0)
+    lengths = _from_wire(payload, 4, count)
+    offset = 4 + count * 4
+    strings = _read_strings(payload[offset:offset + sum(lengths)], lengths)
+    offset += sum(lengths)
+
+    document = {}
+    (subject_count,) = _u32.unpack_from(payload, offset)
+    offset += 4
+    for _ in range(subject_count):
+        name_id, topic_count = _u32_pair.unpack_from(payload, offset)
+        offset += 8
+        subject = document[strings[name_id]] = Subject(strings[name_id])
+        for _ in range(topic_count):
+            name_id, subtopic_count = _u32_pair.unpack_from(payload, offset)
+            offset += 8
+            names = [strings[i] for i in _from_wire(payload, offset, subtopic_count)]
+            offset += subtopic_count * 4
+            flags = array("b")
+            flags.frombytes(payload[offset:offset + subtopic_count])
+            offset += subtopic_count
+            subject.attach_topic(Topic.from_packed(strings[name_id], names, flags))
+
+    (extra_length,) = _u32.unpack_from(payload, offset)
+    offset += 4
+    if extra_length:
+        _restore_extras(document, json.loads(bytes(payload[offset:offset + extra_length])))
+    return document
+
+
+def _read_strings(blob, lengths):
+    ends = list(accumulate(lengths))
+    starts = [end - length for end, length in zip(ends, lengths)]
+    text = str(blob, "utf-8")
+    if len(text) != len(blob):
+        # Multi-byte characters, so byte offsets differ from string offsets
+        return [str(blob[start:end], "utf-8") for start, end in zip(starts, ends)]
+    # Plain ASCII: decode once and slice the string table out of it
+    return list(map(text.__getitem__, map(slice, starts, ends)))
+
+
+def _restore_extras(document, extras):
+    for subject_name, subject_extras in extras.items():
+        subject = document[subject_name]
+        subject.extra = subject_extras.get("extra")
+        for topic_name, topic_extras in subject_extras.get("topics", {}).items():
+            topic = subject.topics[topic_name]
+            topic.extra = topic_extras["extra"]
+            topic.subtopic_extra = topic_extras["subtopics"]
+
+
+if __name__ == "__main__":
+    # python binary_snapshot.py SOURCE TARGET converts between any two formats
+    from storage import convert
+
+    convert(sys.argv[1], sys.argv[2])
@@ -1,17 +1,398 @@
-import json
-import os
+import threading
+from contextlib import contextmanager
+
+from event_log import EventLog
+from storage import ShardedDocument, apply_record, open_storage
+from study_model import document_from_dict, document_to_dict
+
+
+def _reinsert(mapping, index, key, value):
+    # Put a removed entry back at its original position
+    if isinstance(mapping, ShardedDocument):
+        mapping.insert(index, key, value)
+        return
+    items = list(mapping.items())
+    items.insert(index, (key, value))
+    mapping.clear()
+    mapping.update(items)
+
+
+class Transaction:
+    """
+    Mutable view handed out by DataManager.transaction(). Every edit is
+    applied to the live document right away and remembered, together with
+    how to undo it, until the transaction commits.
+    """
+
+    def __init__(self, data, lock):
+        self.data = data
+        self.records = []
+        self._undo = []
+        self._lock = lock
+
+    def savepoint(self):
+        return len(self.records), len(self._undo)
+
+    def rollback(self, mark):
+        records, undo = mark
+        with self._lock:
+            while len(self._undo) > undo:
+                self._undo.pop()()
+            del self.records[records:]
+
+    def _apply(self, record, undo):
+        with self._lock:
+            apply_record(self.data, record)
+        self.records.append(record)
+        self._undo.append(undo)
+
+    def add_subject(self, subject):
+        if subject in self.data:
+            return False
+        self._apply({"op": "add_subject", "path": [subject]},
+                    lambda: self.data.pop(subject, None))
+        return True
+
+    def delete_subject(self, subject):
+        if subject not in self.data:
+            return False
+        index = list(self.data).index(subject)
+        value = self.data[subject]
+        self._apply({"op": "delete_subject", "path": [subject]},
+                    lambda: _reinsert(self.data, index, subject, value))
+        return True
+
+    def add_topic(self, subject, topic):
+        entry = self.data[subject]
+        if topic in entry.topics:
+            return False
+        self._apply({"op": "add_topic", "path": [subject, topic]},
+                    lambda: entry.remove_topic(topic))
+        return True
+
+    def add_subtopic(self, subject, topic, subtopic):
+        entry = self.data[subject].topics[topic]
+        if subtopic in entry:
+            return False
+        self._apply({"op": "add_subtopic", "path": [subject, topic, subtopic]},
+                    lambda: entry.remove(subtopic))
+        return True
+
+    def delete_subtopic(self, subject, topic, subtopic):
+        entry = self.data[subject].topics[topic]
+        if subtopic not in entry:
+            return False
+        position = list(entry).index(subtopic)
+        completed = entry.is_completed(subtopic)
+        extra = entry.subtopic_extra.get(subtopic) if entry.subtopic_extra else None
+        self._apply({"op": "delete_subtopic", "path": [subject, topic, subtopic]},
+                    lambda: entry.add(subtopic, completed, position, extra))
+        return True
+
+    def set_completed(self, subject, topic, subtopic, value):
+        entry = self.data[subject].topics[topic]
+        previous = entry.is_completed(subtopic)
+        if previous == bool(value):
+            return False
+        self._apply({"op": "set_completed", "path": [subject, topic, subtopic], "value": bool(value)},
+                    lambda: entry.set_completed(subtopic, previous))
+        return True
+
 
 class DataManager:
-    def __init__(self, filename="study_data.json"):
+    def __init__(self, filename="study_data.json", journal=False, compact_threshold=256 * 1024,
+                 storage=None, write_behind=False, debounce=0.5, format=None, compression=None,
+                 history=False):
         self.filename = filename
 
+        # Persistence is delegated to a pluggable backend picked from the file
+        # extension or the format argument: JSON or binary snapshots (both
+        # optionally journaled), an indexed SQLite database or per-subject shards
+        self.storage = storage or open_storage(filename, journal=journal,
+                                               compact_threshold=compact_threshold,
+                                               format=format, compression=compression)
+
+        # Parsed {name: Subject} document shared by every caller. It is only
+        # re-read when the backend reports that its files changed behind our back.
+        self._data = None
+
+        # In write-behind mode mutations only touch the in-memory document on
+        # the caller's thread. A worker persists everything queued during one
+        # debounce window with a single write, and close() flushes the rest.
+        self.write_behind = write_behind
+        self.debounce = debounce
+        self._pending = []
+        self._dirty = threading.Event()
+        self._closing = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._writer = None
+        # Last failed background write; its records stay queued for the next flush
+        self.write_error = None
+
+        # Outermost transaction currently open, if any
+        self._transaction = None
+
+        # Callbacks told about every committed change, see subscribe(), and a
+        # counter bumped with each one so views can tell whether they are current
+        self._listeners = []
+        self.version = 0
+
+        # Optional timestamped log of every completion change, kept in its own file
+        self.history = None
+        if history:
+            self.history = EventLog(filename + ".events")
+            self.subscribe(self.history.on_change)
+
+    def _replace_data(self, data):
+        # Update the live document in place so references handed out earlier stay valid
+        if self._data is None:
+            self._data = data
+        elif data is not self._data:
+            if isinstance(self._data, ShardedDocument) and isinstance(data, ShardedDocument):
+                # Keeps the subjects that were not opened yet unloaded
+                self._data.replace(data)
+            else:
+                self._data.clear()
+                self._data.update(data)
+
+    def load_document(self):
+        """
+        Return the live {name: Subject} document
+        """
+        with self.storage.lock:
+            if self._data is not None and (self._pending or self._transaction is not None):
+                # Unwritten mutations make the in-memory copy authoritative
+                return self._data
+            if self._data is not None and not self.storage.is_stale():
+                return self._data
+
+            reloaded = self._data is not None
+            self._replace_data(self.storage.load())
+        if reloaded:
+            self._notify(None)
+        return self._data
+
     def load_data(self):
-        try:
-            with open(self.filename, "r") as file:
-                return json.load(file)
-        except FileNotFoundError:
-            return {}
+        """
+        Compatibility view: a copy of the data in the study_data.json schema.
+        This copies every subject, so it is only meant for exports and
+        migrations; the app reads through load_document().
+        """
+        document = self.load_document()
+        if isinstance(document, ShardedDocument):
+            # Unopened shards are read for the copy but not kept in memory
+            return {name: document.peek(name).to_dict() for name in document}
+        return document_to_dict(document)
 
     def save_data(self, data):
-        with open(self.filename, "w") as file:
-            json.dump(data, file)
\ No newline at end of file
+        """
+        Compatibility view: replace everything with data in the study_data.json schema
+        """
+        # Serialized with the write-behind worker so an older batch cannot land after this snapshot
+        with self._flush_lock, self.storage.lock:
+            self._replace_data(document_from_dict(data))
+            self.storage.save(self._data)
+            self._pending.clear()
+        self._notify(None)
+
+    def subscribe(self, callback):
+        """
+        Call callback(records) after every committed change with the mutation
+        records it made, or with None when the whole document was replaced
+        """
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _notify(self, records):
+        self.version += 1
+        for callback in list(self._listeners):
+            callback(records)
+
+    # Targeted mutations. Each one is a one-step transaction.
+
+    def add_subject(self, subject):
+        with self.transaction() as txn:
+            return txn.add_subject(subject)
+
+    def delete_subject(self, subject):
+        with self.transaction() as txn:
+            return txn.delete_subject(subject)
+
+    def add_topic(self, subject, topic):
+        with self.transaction() as txn:
+            return txn.add_topic(subject, topic)
+
+    def add_subtopic(self, subject, topic, subtopic):
+        with self.transaction() as txn:
+            return txn.add_subtopic(subject, topic, subtopic)
+
+    def delete_subtopic(self, subject, topic, subtopic):
+        with self.transaction() as txn:
+            return txn.delete_subtopic(subject, topic, subtopic)
+
+    def set_completed(self, subject, topic, subtopic, value):
+        with self.transaction() as txn:
+            return txn.set_completed(subject, topic, subtopic, value)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Hand out a mutable view of the study data. Edits apply to the live
+        document immediately and are persisted together, once, when the
+        outermost transaction exits. An exception rolls back every edit made
+        inside the failing block; nested blocks act as savepoints.
+        """
+        outer = self._transaction
+        if outer is None:
+            txn = self._transaction = Transaction(self.load_document(), self.storage.lock)
+        else:
+            txn = outer
+        mark = txn.savepoint()
+
+        try:
+            yield txn
+            if outer is None:
+                # A failed write is rolled back too, so memory keeps matching the file
+                self._persist(txn.records)
+        except BaseException:
+            txn.rollback(mark)
+            if outer is None:
+                self._transaction = None
+            raise
+
+        if outer is None:
+            self._transaction = None
+            if txn.records:
+                self._notify(txn.records)
+
+    def _in_memory(self):
+        # Whether reads and writes are served from the loaded document
+        return self.write_behind or not self.storage.targeted
+
+    def _persist(self, records):
+        if not records:
+            return
+
+        with self.storage.lock:
+            if self.write_behind:
+                self._pending.extend(records)
+                self._start_writer()
+                self._dirty.set()
+                return
+
+            self.storage.append_batch(records, self._data)
+
+    # Write-behind queue
+
+    def _start_writer(self):
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_behind_loop, daemon=True)
+            self._writer.start()
+
+    def _write_behind_loop(self):
+        while not self._closing.is_set():
+            self._dirty.wait()
+            # Let further mutations pile up until the debounce window ends
+            self._closing.wait(self.debounce)
+            try:
+                self.flush()
+            except Exception:
+                # Recorded by flush(); the worker keeps going and retries with the next batch
+                pass
+
+    def flush(self):
+        """
+        Persist every queued mutation with one write. If the write fails the
+        mutations stay queued, the error is kept in write_error and raised.
+        """
+        with self._flush_lock:
+            with self.storage.lock:
+                records, self._pending = self._pending, []
+                self._dirty.clear()
+            if not records:
+                return
+            try:
+                self.storage.append_batch(records, self._data)
+            except Exception as e:
+                with self.storage.lock:
+                    self._pending[:0] = records
+                self.write_error = e
+                print(f"Error saving data: {e}")
+                raise
+            self.write_error = None
+
+    def count_completed(self, subject, topic=None):
+        """
+        Return (completed, total) subtopic counts for a subject or one of its
+        topics. Served in O(1) from the document's counters once it is loaded;
+        a targeted backend only answers with SQL counts before the first load.
+        """
+        if self._data is None and not self._in_memory():
+            return self.storage.count_completed(subject, topic)
+
+        data = self.load_document()
+        if topic is None and isinstance(data, ShardedDocument):
+            # Subjects that were never opened are counted from the manifest
+            counts = data.summary_counts(subject)
+            if counts is not None:
+                return counts
+        if topic is None:
+            return data[subject].count_completed()
+        return data[subject].topics[topic].count_completed()
+
+    def completion_counts(self, include_topics=True):
+        """
+        Return {subject: ((completed, total), {topic: (completed, total)})} for
+        every subject in one pass over the loaded document. Without
+        include_topics the per-topic dicts are None, which lets sharded
+        storage answer from its manifest alone.
+        """
+        if self._data is None and not self._in_memory():
+            return self.storage.completion_counts(include_topics)
+
+        data = self.load_document()
+        counts = {}
+        for name in data:
+            if not include_topics and isinstance(data, ShardedDocument):
+                summary = data.summary_counts(name)
+                if summary is not None:
+                    counts[name] = (summary, None)
+                    continue
+            subject = data[name]
+            topics = None
+            if include_topics:
+                topics = {topic_name: topic.count_completed() for topic_name, topic in subject.topics.items()}
+            counts[name] = (subject.count_completed(), topics)
+        return counts
+
+    def verify_counters(self):
+        """
+        Optional consistency check: recompute every loaded subject's counters
+        from scratch, repair them, and return the names of subjects that were off
+        """
+        data = self.load_document()
+        with self.storage.lock:
+            return [
+                name for name in data
+                if not (isinstance(data, ShardedDocument) and not data.is_loaded(name))
+                and data[name].recount()
+            ]
+
+    def close(self):
+        """
+        Flush queued writes and release the storage backend
+        """
+        self._closing.set()
+        self._dirty.set()
+        if self._writer is not None:
+            self._writer.join()
+        try:
+            self.flush()
+        finally:
+            self.storage.close()
+            if self.history is not None:
+                self.history.close()
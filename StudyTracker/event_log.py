@@ -0,0 +1,215 @@
+"""
+Append-only history of completion changes, kept next to the study data.
+
+Every time a subtopic is checked or unchecked one fixed-size event is
+appended to FILENAME.events:
+
+    timestamp (f64 seconds), subject id, topic id, subtopic id (u32),
+    completed (u8), all little-endian
+
+Ids point into FILENAME.events.names, an append-only list of JSON strings.
+In memory the events are held column by column in arrays, with a
+per-subject index so time range queries are two binary searches.
+"""
+import json
+import os
+import struct
+import sys
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter, namedtuple
+
+_EVENT = struct.Struct("<dIIIB")
+_U32 = "I" if array("I").itemsize == 4 else "L"
+
+Event = namedtuple("Event", "timestamp subject topic subtopic completed")
+
+
+class EventLog:
+    def __init__(self, filename):
+        self.filename = filename
+        self.names_filename = filename + ".names"
+
+        self.names = []
+        self._ids = {}
+
+        # Columns, in append order. Timestamps never decrease, so every
+        # column is also sorted by time.
+        self.times = array("d")
+        self.subjects = array(_U32)
+        self.topics = array(_U32)
+        self.subtopics = array(_U32)
+        self.completed = array("b")
+
+        # Per-subject index: positions into the columns and their timestamps
+        self._subject_positions = {}
+        self._subject_times = {}
+
+        self._events_file = None
+        self._names_file = None
+        self._load()
+
+    def _load(self):
+        if os.path.exists(self.names_filename):
+            with open(self.names_filename, "rb") as f:
+                buffer = f.read()
+            if buffer and not buffer.endswith(b"\n"):
+                # Torn last line from a crash; no event can refer to it
+                buffer = buffer[:buffer.rfind(b"\n") + 1]
+                with open(self.names_filename, "r+b") as f:
+                    f.truncate(len(buffer))
+            lines = buffer.decode("utf-8").split("\n")
+            self.names = [sys.intern(name) for name in json.loads("[" + ",".join(lines[:-1]) + "]")]
+            self._ids = {name: name_id for name_id, name in enumerate(self.names)}
+
+        if os.path.exists(self.filename):
+            with open(self.filename, "rb") as f:
+                buffer = f.read()
+            # Drop a torn last event
+            usable = len(buffer) - len(buffer) % _EVENT.size
+            if usable != len(buffer):
+                with open(self.filename, "r+b") as f:
+                    f.truncate(usable)
+            self._load_columns(buffer[:usable])
+
+    def _load_columns(self, buffer):
+        # Split the fixed-size rows into columns with strided byte copies
+        # instead of unpacking events one at a time
+        count = len(buffer) // _EVENT.size
+        offset = 0
+        for column, width in ((self.times, 8), (self.subjects, 4), (self.topics, 4),
+                              (self.subtopics, 4), (self.completed, 1)):
+            lanes = bytearray(count * width)
+            for byte in range(width):
+                lanes[byte::width] = buffer[offset + byte::_EVENT.size]
+            offset += width
+            values = array(column.typecode)
+            values.frombytes(lanes)
+            if sys.byteorder == "big" and width > 1:
+                values.byteswap()
+            column.extend(values)
+
+        # Group positions by subject; the sort is stable so each group stays in time order
+        order = sorted(range(count), key=self.subjects.__getitem__)
+        start = 0
+        for subject_id, size in sorted(Counter(self.subjects).items()):
+            positions = array(_U32, order[start:start + size])
+            start += size
+            self._subject_positions[subject_id] = positions
+            self._subject_times[subject_id] = array("d", map(self.times.__getitem__, positions))
+
+    def _name_id(self, name):
+        name_id = self._ids.get(name)
+        if name_id is None:
+            if self._names_file is None:
+                self._names_file = open(self.names_filename, "ab")
+            self._names_file.write(json.dumps(name).encode("utf-8") + b"\n")
+            name_id = self._ids[name] = len(self.names)
+            self.names.append(sys.intern(name))
+        return name_id
+
+    def _add(self, timestamp, subject_id, topic_id, subtopic_id, completed):
+        position = len(self.times)
+        self.times.append(timestamp)
+        self.subjects.append(subject_id)
+        self.topics.append(topic_id)
+        self.subtopics.append(subtopic_id)
+        self.completed.append(completed)
+
+        positions = self._subject_positions.get(subject_id)
+        if positions is None:
+            positions = self._subject_positions[subject_id] = array(_U32)
+            self._subject_times[subject_id] = array("d")
+        positions.append(position)
+        self._subject_times[subject_id].append(timestamp)
+
+    def record(self, subject, topic, subtopic, completed, timestamp=None):
+        """
+        Append one completion change
+        """
+        self.record_many([(subject, topic, subtopic, completed)], timestamp)
+
+    def record_many(self, changes, timestamp=None):
+        """
+        Append (subject, topic, subtopic, completed) changes with one write
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        if self.times and timestamp < self.times[-1]:
+            # Keep the log ordered even if the wall clock steps backwards
+            timestamp = self.times[-1]
+
+        chunks = []
+        for subject, topic, subtopic, completed in changes:
+            event = (timestamp, self._name_id(subject), self._name_id(topic),
+                     self._name_id(subtopic), int(bool(completed)))
+            self._add(*event)
+            chunks.append(_EVENT.pack(*event))
+        if not chunks:
+            return
+
+        # Names go to disk before the events that refer to them
+        if self._names_file is not None:
+            self._names_file.flush()
+        if self._events_file is None:
+            self._events_file = open(self.filename, "ab")
+        self._events_file.write(b"".join(chunks))
+        self._events_file.flush()
+
+    def on_change(self, records):
+        """
+        DataManager listener: log every set_completed record
+        """
+        if records:
+            self.record_many([
+                (*record["path"], record["value"])
+                for record in records if record["op"] == "set_completed"
+            ])
+
+    def span(self, subject=None, start=None, end=None):
+        """
+        Return the positions of the events for subject (or all subjects) with
+        start <= timestamp <= end, as an array of column indexes or a range
+        """
+        if subject is None:
+            times = self.times
+        else:
+            subject_id = self._ids.get(subject)
+            if subject_id not in self._subject_times:
+                return range(0)
+            times = self._subject_times[subject_id]
+
+        low = 0 if start is None else bisect_left(times, start)
+        high = len(times) if end is None else bisect_right(times, end)
+        if subject is None:
+            return range(low, high)
+        return self._subject_positions[subject_id][low:high]
+
+    def count(self, subject=None, start=None, end=None):
+        return len(self.span(subject, start, end))
+
+    def query(self, subject=None, start=None, end=None, topic=None):
+        """
+        Return the Events for subject (or all subjects) between start and end,
+        optionally limited to one topic, oldest first
+        """
+        names = self.names
+        topic_id = self._ids.get(topic) if topic is not None else None
+        if topic is not None and topic_id is None:
+            return []
+        return [
+            Event(self.times[i], names[self.subjects[i]], names[self.topics[i]],
+                  names[self.subtopics[i]], bool(self.completed[i]))
+            for i in self.span(subject, start, end)
+            if topic_id is None or self.topics[i] == topic_id
+        ]
+
+    def close(self):
+        for f in (self._events_file, self._names_file):
+            if f is not None:
+                f.close()
+        self._events_file = self._names_file = None
+
+    def __len__(self):
+        return len(self.times)
@@ -2,7 +2,6 @@ import os
 import sys
 from ctypes import windll, byref, create_unicode_buffer, create_string_buffer
 import tkinter as tk
-from tkinter import ttk
 
 
 class FontManager:
@@ -55,42 +54,6 @@ class FontManager:
             print(f"Error loading custom font: {e}")
             return "Helvetica"
 
-    def configure_styles(self, root=None):
-        """
-        Configure styles for the entire application with the custom font
-        """
-        style = ttk.Style()
-
-        # General styles
-        style.configure('TLabel', font=(self.custom_font, 10))
-        style.configure('TButton', font=(self.custom_font, 10))
-        style.configure('Clock.TLabel', font=(self.custom_font, 48))
-        style.configure('Header.TLabel', font=(self.custom_font, 14, 'bold'))
-        style.configure('Sidebar.TButton', font=(self.custom_font, 11, 'bold'))
-        style.configure('Topic.TLabel', font=(self.custom_font, 12))
-        style.configure('Subtopic.TLabel', font=(self.custom_font, 10))
-
-        # Specific styles for each component
-        # Add more specific style configurations here as needed
-        style.configure("Subject.TButton", font=(self.custom_font, 11))
-        style.configure("Delete.TButton", font=(self.custom_font, 8))
-        style.configure("AddTopic.TButton", font=(self.custom_font, 12, 'bold'))
-        style.configure("Sidebar.TButton", font=(self.custom_font, 11, 'bold'))
-
-        # Dialog styles
-        style.configure("Dialog.TLabel", font=(self.custom_font, 12))
-        style.configure("Dialog.TButton", font=(self.custom_font, 10))
-
-        # Topic Frame styles
-        style.configure(
-            "Topic.TLabelframe.Label",
-            font=(self.custom_font, 12, "bold")
-        )
-        style.configure(
-            "Subtopic.TCheckbutton",
-            font=(self.custom_font, 10)
-        )
-
     def get_font(self):
         """
         Return the custom font name
@@ -2,18 +2,75 @@ class ProgressCalculator:
     def __init__(self, data_manager):
         self.data_manager = data_manager
 
+        # Memoized percentages keyed by tree position: () for all subjects,
+        # (subject,) and (subject, topic). A change only drops its own ancestors.
+        self._memo = {}
+        self.data_manager.subscribe(self.invalidate)
+
+    @staticmethod
+    def percentage(completed, total):
+        return int((completed / total * 100) if total > 0 else 0)
+
+    def invalidate(self, records=None):
+        """
+        Drop memoized percentages touched by the given mutation records, or
+        everything when records is None
+        """
+        if records is None:
+            self._memo.clear()
+            return
+
+        self._memo.pop((), None)
+        for record in records:
+            path = record["path"]
+            self._memo.pop((path[0],), None)
+            if len(path) > 1:
+                self._memo.pop((path[0], path[1]), None)
+            elif record["op"] == "delete_subject":
+                for key in [key for key in self._memo if key[0] == path[0]]:
+                    del self._memo[key]
+
+    def _memoized(self, key, counts):
+        value = self._memo.get(key)
+        if value is None:
+            value = self._memo[key] = self.percentage(*counts())
+        return value
+
+    def calculate_overall_completion(self):
+        """
+        Percentage of every subtopic across all subjects
+        """
+        value = self._memo.get(())
+        if value is None:
+            self.calculate_all_completions(include_topics=False)
+            value = self._memo[()]
+        return value
+
     def calculate_subject_completion(self, subject):
-        data = self.data_manager.load_data()
-        if not data[subject]["topics"]:
-            return 0
+        # Counters are maintained incrementally by the data layer, so this is O(1)
+        return self._memoized((subject,), lambda: self.data_manager.count_completed(subject))
 
-        total_subtopics = 0
-        completed_subtopics = 0
+    def calculate_topic_completion(self, subject, topic):
+        return self._memoized((subject, topic), lambda: self.data_manager.count_completed(subject, topic))
 
-        for topic in data[subject]["topics"].values():
-            for subtopic in topic["subtopics"].values():
-                total_subtopics += 1
-                if subtopic["completed"]:
-                    completed_subtopics += 1
+    def calculate_subtopic_completion(self, subject, topic, subtopic):
+        document = self.data_manager.load_document()
+        return 100 if document[subject].topics[topic].is_completed(subtopic) else 0
 
-        return int((completed_subtopics / total_subtopics * 100) if total_subtopics > 0 else 0)
\ No newline at end of file
+    def calculate_all_completions(self, include_topics=True):
+        """
+        Return {subject: {"percentage": int, "topics": {topic: int}}} for every
+        subject from a single pass over the data
+        """
+        completions = {}
+        completed = total = 0
+        for subject, (counts, topics) in self.data_manager.completion_counts(include_topics).items():
+            completed += counts[0]
+            total += counts[1]
+            percentage = self._memo[(subject,)] = self.percentage(*counts)
+            if topics is not None:
+                topics = {topic: self.percentage(*topic_counts) for topic, topic_counts in topics.items()}
+                self._memo.update(((subject, topic), value) for topic, value in topics.items())
+            completions[subject] = {"percentage": percentage, "topics": topics}
+        self._memo[()] = self.percentage(completed, total)
+        return completions
\ No newline at end of file
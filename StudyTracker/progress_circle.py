@@ -1,5 +1,15 @@
+from PIL import Image, ImageDraw, ImageTk
+
+from animation import Animator, ease_out_cubic, ease_in_out_quad
+
+
 class ProgressCircle:
-    def __init__(self, canvas):
+    # Geometry of the ring
+    CENTER_X, CENTER_Y = 100, 100
+    RADIUS = 80
+    INNER_RADIUS = RADIUS - 10  # Create a thicker circle
+
+    def __init__(self, canvas, gradient=False):
         self.canvas = canvas
         # Modern color scheme
         self.colors = {
@@ -12,73 +22,148 @@ class ProgressCircle:
         self.canvas.configure(bg=self.colors['background'])  # Set canvas background
         self.congrats_shown = False
 
+        # With gradient on, the arc is drawn as an image shaded from
+        # progress_start to progress_end; one image is cached per percentage
+        self.gradient = gradient
+        self._gradient_images = {}
 
-    def draw(self, percentage):
-        self.canvas.delete("all")
+        # Target percentage and the value the arc currently shows while animating
+        self.percentage = None
+        self.shown = 0
+        self.animator = Animator.for_widget(self.canvas)
+        self.create_items()
 
-        # Constants for circle
-        center_x, center_y = 100, 100
-        radius = 80
-        inner_radius = radius - 10  # Create a thicker circle
+    def create_items(self):
+        # Every item is created once; draw() only updates them in place
+        x, y, r, ir = self.CENTER_X, self.CENTER_Y, self.RADIUS, self.INNER_RADIUS
 
-        # Draw shadow (subtle depth effect)
+        # Shadow (subtle depth effect)
         self.canvas.create_oval(
-            center_x - radius + 2, center_y - radius + 2,
-            center_x + radius + 2, center_y + radius + 2,
+            x - r + 2, y - r + 2, x + r + 2, y + r + 2,
             fill='#dee2e6', outline='#dee2e6'
         )
 
-        # Draw background circle
+        # Background circle
         self.canvas.create_oval(
-            center_x - radius, center_y - radius,
-            center_x + radius, center_y + radius,
+            x - r, y - r, x + r, y + r,
             fill=self.colors['circle_bg'], outline=self.colors['circle_bg']
         )
 
-        # Draw progress arc
-        angle = percentage * 3.6  # Convert percentage to degrees
-        if angle > 0:
-            # Create gradient effect for progress
-            for i in range(int(angle)):
-                self.canvas.create_arc(
-                    center_x - radius, center_y - radius,
-                    center_x + radius, center_y + radius,
-                    start=90 - i, extent=-1,
-                    fill=self.colors['progress_end'],
-                    outline=self.colors['progress_end']
-                )
+        # Progress arc, clockwise from twelve o'clock
+        self.arc = self.canvas.create_arc(
+            x - r, y - r, x + r, y + r,
+            start=90, extent=0,
+            fill=self.colors['progress_end'],
+            outline=self.colors['progress_end'],
+            state="hidden"
+        )
+        self.gradient_item = self.canvas.create_image(x, y, state="hidden")
 
-        # Draw inner circle for cleaner look
+        # Inner circle for cleaner look
         self.canvas.create_oval(
-            center_x - inner_radius, center_y - inner_radius,
-            center_x + inner_radius, center_y + inner_radius,
+            x - ir, y - ir, x + ir, y + ir,
             fill=self.colors['background'], outline=self.colors['background']
         )
 
-        # Draw percentage text with shadow
-        self.canvas.create_text(
-            center_x + 1, center_y + 1,
-            text=f"{percentage}%",
+        # Percentage text with shadow
+        self.text_shadow = self.canvas.create_text(
+            x + 1, y + 1,
             font=("Helvetica", 24, "bold"),
             fill="#cccccc"
         )
-        self.canvas.create_text(
-            center_x, center_y,
-            text=f"{percentage}%",
+        self.text = self.canvas.create_text(
+            x, y,
             font=("Helvetica", 24, "bold"),
             fill=self.colors['text']
         )
 
+    def draw(self, percentage, animate=True):
+        # The congratulations text only lasts until the next redraw
+        self.animator.cancel(self.canvas, "congrats")
+        self.canvas.delete("congrats")
+
+        if percentage != self.percentage:
+            first = self.percentage is None
+            self.percentage = percentage
+            if first or not animate:
+                # Jump straight to the value
+                self.animator.cancel(self.canvas, "arc")
+                self.show(percentage)
+            else:
+                # Glide from whatever is on screen now, even mid-animation
+                start = self.shown
+                self.animator.start(
+                    self.canvas, 0.4,
+                    lambda t: self.show(start + (percentage - start) * t),
+                    easing=ease_out_cubic,
+                    key="arc"
+                )
+
         # Show congratulations message when reaching 100%
         if percentage == 100 and not self.congrats_shown:
-            self.show_congratulations(center_x, center_y + radius + 30)
+            self.show_congratulations(self.CENTER_X, self.CENTER_Y + self.RADIUS + 30)
             self.congrats_shown = True
         elif percentage < 100:
             self.congrats_shown = False
 
+    def stop(self):
+        """
+        Finish any running animation at once, e.g. when the view is hidden
+        """
+        self.animator.cancel(self.canvas, "arc")
+        self.animator.cancel(self.canvas, "congrats")
+        if self.percentage is not None:
+            self.show(self.percentage)
+
+    def show(self, value):
+        self.shown = value
+        self.set_arc(value)
+        self.canvas.itemconfigure(self.text_shadow, text=f"{round(value)}%")
+        self.canvas.itemconfigure(self.text, text=f"{round(value)}%")
+
+    def set_arc(self, percentage):
+        angle = percentage * 3.6  # Convert percentage to degrees
+        if self.gradient:
+            self.canvas.itemconfigure(self.arc, state="hidden")
+            if angle > 0:
+                self.canvas.itemconfigure(self.gradient_item, image=self.gradient_image(round(percentage)),
+                                          state="normal")
+            else:
+                self.canvas.itemconfigure(self.gradient_item, state="hidden")
+        elif angle >= 360:
+            # A full-circle extent collapses to nothing, so stop just short of it
+            self.canvas.itemconfigure(self.arc, extent=-359.99, state="normal")
+        elif angle > 0:
+            self.canvas.itemconfigure(self.arc, extent=-angle, state="normal")
+        else:
+            self.canvas.itemconfigure(self.arc, state="hidden")
+
+    def gradient_image(self, percentage):
+        image = self._gradient_images.get(percentage)
+        if image is None:
+            size = self.RADIUS * 2
+            canvas_image = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+            draw = ImageDraw.Draw(canvas_image)
+            start = self._rgb(self.colors['progress_start'])
+            end = self._rgb(self.colors['progress_end'])
+            degrees = round(percentage * 3.6)
+            for i in range(degrees):
+                t = i / 359
+                color = tuple(round(a + (b - a) * t) for a, b in zip(start, end))
+                # PIL measures angles clockwise from three o'clock
+                # Slices overlap slightly so no seams show between them
+                draw.pieslice((0, 0, size - 1, size - 1), -90 + i, -90 + min(i + 1.5, degrees), fill=color)
+            image = self._gradient_images[percentage] = ImageTk.PhotoImage(canvas_image,
+                                                                          master=self.canvas)
+        return image
+
+    @staticmethod
+    def _rgb(color):
+        return tuple(int(color[i:i + 2], 16) for i in (1, 3, 5))
+
     def show_congratulations(self, x, y):
         # Create celebration text with animation
-        self.canvas.create_text(
+        text = self.canvas.create_text(
             x, y,
             text="Congratulations!",
             font=("Helvetica", 16, "bold"),
@@ -86,9 +171,11 @@ class ProgressCircle:
             tags="congrats"
         )
 
-        # Add subtle animation
-        def animate():
-            self.canvas.move("congrats", 0, -1)
-            self.canvas.after(1, animate)
-
-        animate()
\ No newline at end of file
+        # Float the text up a little, once
+        rise = 25
+        self.animator.start(
+            self.canvas, 1.2,
+            lambda t: self.canvas.coords(text, x, y - rise * t),
+            easing=ease_in_out_quad,
+            key="congrats"
+        )
\ No newline at end of file
@@ -0,0 +1,740 @@
+import json
+import os
+import sqlite3
+import threading
+from collections.abc import MutableMapping
+
+import binary_snapshot
+from study_model import Subject, Topic, document_from_dict, document_to_dict
+
+
+def apply_record(data, record):
+    """
+    Apply a single mutation record to a {name: Subject} document
+    """
+    op = record["op"]
+    path = record["path"]
+
+    if op == "add_subject":
+        if path[0] not in data:
+            data[path[0]] = Subject(path[0])
+    elif op == "delete_subject":
+        data.pop(path[0], None)
+    elif op == "add_topic":
+        data[path[0]].add_topic(path[1])
+    elif op == "add_subtopic":
+        data[path[0]].topics[path[1]].add(path[2])
+    elif op == "delete_subtopic":
+        topic = data[path[0]].topics[path[1]]
+        if path[2] in topic:
+            topic.remove(path[2])
+    elif op == "set_completed":
+        data[path[0]].topics[path[1]].set_completed(path[2], record["value"])
+    else:
+        raise ValueError(f"Unknown mutation record: {op}")
+
+
+def write_atomic(filename, text):
+    # Write to a temp file next to the target and swap it in, so a crash
+    # mid-write never leaves a truncated file behind
+    temp_name = f"{filename}.{threading.get_ident()}.tmp"
+    with open(temp_name, "wb" if isinstance(text, bytes) else "w") as file:
+        file.write(text)
+    os.replace(temp_name, filename)
+
+
+def file_stamp(filename):
+    try:
+        stat = os.stat(filename)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class JsonStorage:
+    """
+    The original study_data.json file, optionally with an append-only journal
+    """
+    # Mutations need the whole document in memory to be persisted
+    targeted = False
+
+    def __init__(self, filename, journal=False, compact_threshold=256 * 1024):
+        self.filename = filename
+        self.lock = threading.RLock()
+
+        # In journal mode mutations are appended to a small log next to the
+        # snapshot instead of rewriting the whole file. The log is replayed on
+        # load and folded back into the snapshot once it grows too large.
+        self.journal = journal
+        self.journal_filename = filename + ".journal"
+        self.compact_threshold = compact_threshold
+        self._journal_file = None
+        self._compactor = None
+        self._compacting = False
+        self._writing = False
+
+        # Stamp of the files as we last read or wrote them
+        self._stamp = None
+
+    def _current_stamp(self):
+        if self.journal:
+            return (file_stamp(self.filename), file_stamp(self.journal_filename))
+        return file_stamp(self.filename)
+
+    def is_stale(self):
+        with self.lock:
+            # Our own background writes change the files without changing their content
+            if self._compacting or self._writing:
+                return False
+            return self._current_stamp() != self._stamp
+
+    def load(self):
+        self._wait_for_compaction()
+        with self.lock:
+            stamp = self._current_stamp()
+            data = self._read_snapshot()
+            if self.journal:
+                self._replay_journal(data, None)
+            self._stamp = stamp
+
+        if self.journal and stamp[1] is not None and stamp[1][1] >= self.compact_threshold:
+            self._start_compaction()
+        return data
+
+    def save(self, data):
+        # Let a background compaction finish so it cannot overwrite this snapshot
+        self._wait_for_compaction()
+        with self.lock:
+            write_atomic(self.filename, self._encode(data))
+            if self.journal:
+                # The snapshot now contains everything the journal described
+                self._close_journal()
+                if os.path.exists(self.journal_filename):
+                    os.remove(self.journal_filename)
+            self._stamp = self._current_stamp()
+
+    def append(self, record, data):
+        self.append_batch([record], data)
+
+    def append_batch(self, records, data):
+        """
+        Persist several mutation records with a single write. Without a
+        journal the serialized snapshot is taken under the lock but written
+        outside it, so callers on other threads are not held up by the I/O.
+        """
+        if not self.journal:
+            self._wait_for_compaction()
+            with self.lock:
+                text = self._encode(data)
+                self._writing = True
+            try:
+                write_atomic(self.filename, text)
+            finally:
+                with self.lock:
+                    self._writing = False
+                    self._stamp = self._current_stamp()
+            return
+
+        with self.lock:
+            journal_file = self._open_journal()
+            journal_file.write(b"".join(json.dumps(record).encode("utf-8") + b"\n" for record in records))
+            journal_file.flush()
+            journal_size = journal_file.tell()
+            if not self._compacting:
+                self._stamp = self._current_stamp()
+
+        if journal_size >= self.compact_threshold:
+            self._start_compaction()
+
+    def close(self):
+        """
+        Wait for a running compaction and release the journal file
+        """
+        self._wait_for_compaction()
+        with self.lock:
+            self._close_journal()
+
+    def is_empty(self):
+        return file_stamp(self.filename) is None and file_stamp(self.journal_filename) is None
+
+    def _read_snapshot(self):
+        try:
+            with open(self.filename, "r") as file:
+                return document_from_dict(json.load(file))
+        except FileNotFoundError:
+            return {}
+
+    def _encode(self, data):
+        return json.dumps(document_to_dict(data))
+
+    # Journal handling
+
+    def _open_journal(self):
+        if self._journal_file is None:
+            self._journal_file = open(self.journal_filename, "ab")
+        return self._journal_file
+
+    def _close_journal(self):
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
+
+    def _replay_journal(self, data, limit):
+        try:
+            with open(self.journal_filename, "rb") as file:
+                lines = file.read(limit if limit is not None else -1).splitlines()
+        except FileNotFoundError:
+            return
+
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A torn final line from an interrupted append
+                continue
+            try:
+                apply_record(data, record)
+            except KeyError:
+                # Records are idempotent, so ones that no longer apply are skipped
+                continue
+
+    def _wait_for_compaction(self):
+        compactor = self._compactor
+        if compactor is not None and compactor is not threading.current_thread():
+            compactor.join()
+
+    def _start_compaction(self):
+        with self.lock:
+            if self._compacting:
+                return
+            self._compacting = True
+        self._compactor = threading.Thread(target=self.compact, daemon=True)
+        self._compactor.start()
+
+    def compact(self):
+        """
+        Fold the journal into a fresh snapshot. This works from the files
+        alone so it never touches the live document; records appended while
+        the snapshot is being written are carried over into the new journal.
+        """
+        try:
+            with self.lock:
+                self._close_journal()
+                offset = file_stamp(self.journal_filename)
+                offset = offset[1] if offset else 0
+
+            data = self._read_snapshot()
+            self._replay_journal(data, offset)
+            write_atomic(self.filename, self._encode(data))
+
+            with self.lock:
+                self._close_journal()
+                try:
+                    with open(self.journal_filename, "rb") as file:
+                        file.seek(offset)
+                        tail = file.read()
+                except FileNotFoundError:
+                    tail = b""
+
+                temp_name = self.journal_filename + ".tmp"
+                with open(temp_name, "wb") as file:
+                    file.write(tail)
+                os.replace(temp_name, self.journal_filename)
+                self._stamp = self._current_stamp()
+        finally:
+            self._compacting = False
+
+
+class BinaryStorage(JsonStorage):
+    """
+    Binary snapshot (see binary_snapshot.py) with optional zlib or lzma
+    compression. Journal mode and compaction work as for JSON.
+    """
+
+    def __init__(self, filename, compression=None, **kwargs):
+        super().__init__(filename, **kwargs)
+        self.compression = compression
+
+    def _read_snapshot(self):
+        try:
+            with open(self.filename, "rb") as file:
+                return binary_snapshot.loads(file.read())
+        except FileNotFoundError:
+            return {}
+
+    def _encode(self, data):
+        return binary_snapshot.dumps(data, self.compression)
+
+
+class SqliteStorage:
+    """
+    Indexed SQLite database with one table per level of the study tree
+    """
+    # Mutations and counts are answered by touching only the rows involved
+    targeted = True
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS subjects (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        );
+        CREATE TABLE IF NOT EXISTS topics (
+            id INTEGER PRIMARY KEY,
+            subject_id INTEGER NOT NULL REFERENCES subjects(id) ON DELETE CASCADE,
+            name TEXT NOT NULL,
+            UNIQUE (subject_id, name)
+        );
+        CREATE TABLE IF NOT EXISTS subtopics (
+            id INTEGER PRIMARY KEY,
+            topic_id INTEGER NOT NULL REFERENCES topics(id) ON DELETE CASCADE,
+            name TEXT NOT NULL,
+            completed INTEGER NOT NULL DEFAULT 0,
+            UNIQUE (topic_id, name)
+        );
+        CREATE INDEX IF NOT EXISTS subtopics_by_completion ON subtopics (topic_id, completed);
+    """
+
+    _TOPIC_ID = (
+        "SELECT topics.id FROM topics JOIN subjects ON topics.subject_id = subjects.id "
+        "WHERE subjects.name = ? AND topics.name = ?"
+    )
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(filename, check_same_thread=False)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        with self.connection:
+            self.connection.executescript(self.SCHEMA)
+        self._stamp = file_stamp(self.filename)
+
+    def is_stale(self):
+        with self.lock:
+            return file_stamp(self.filename) != self._stamp
+
+    def is_empty(self):
+        with self.lock:
+            return self.connection.execute("SELECT 1 FROM subjects LIMIT 1").fetchone() is None
+
+    def load(self):
+        """
+        Build the document for the whole database
+        """
+        with self.lock:
+            data = {}
+            subjects = {}
+            topics = {}
+            for subject_id, name in self.connection.execute(
+                    "SELECT id, name FROM subjects ORDER BY id"):
+                subject = subjects[subject_id] = Subject(name)
+                data[subject.name] = subject
+            for topic_id, subject_id, name in self.connection.execute(
+                    "SELECT id, subject_id, name FROM topics ORDER BY id"):
+                topic = topics[topic_id] = Topic(name)
+                subjects[subject_id].attach_topic(topic)
+            for topic_id, name, completed in self.connection.execute(
+                    "SELECT topic_id, name, completed FROM subtopics ORDER BY id"):
+                topics[topic_id].add(name, completed)
+            self._stamp = file_stamp(self.filename)
+            return data
+
+    def save(self, data):
+        """
+        Replace the database contents with the given document
+        """
+        with self.lock:
+            with self.connection:
+                self.connection.execute("DELETE FROM subjects")
+                for subject, subject_data in data.items():
+                    subject_id = self.connection.execute(
+                        "INSERT INTO subjects (name) VALUES (?)", (subject,)).lastrowid
+                    for topic, topic_data in subject_data.topics.items():
+                        topic_id = self.connection.execute(
+                            "INSERT INTO topics (subject_id, name) VALUES (?, ?)",
+                            (subject_id, topic)).lastrowid
+                        self.connection.executemany(
+                            "INSERT INTO subtopics (topic_id, name, completed) VALUES (?, ?, ?)",
+                            [(topic_id, name, int(completed)) for name, completed in topic_data.items()])
+            self._stamp = file_stamp(self.filename)
+
+    def append(self, record, data):
+        self.append_batch([record], data)
+
+    def append_batch(self, records, data):
+        # All records go through one transaction
+        with self.lock:
+            with self.connection:
+                for record in records:
+                    self._execute_record(record)
+            self._stamp = file_stamp(self.filename)
+
+    def _execute_record(self, record):
+        op = record["op"]
+        path = record["path"]
+
+        if op == "add_subject":
+            self.connection.execute("INSERT OR IGNORE INTO subjects (name) VALUES (?)", path)
+        elif op == "delete_subject":
+            self.connection.execute("DELETE FROM subjects WHERE name = ?", path)
+        elif op == "add_topic":
+            self.connection.execute(
+                "INSERT OR IGNORE INTO topics (subject_id, name) "
+                "SELECT id, ? FROM subjects WHERE name = ?",
+                (path[1], path[0]))
+        elif op == "add_subtopic":
+            self.connection.execute(
+                "INSERT OR IGNORE INTO subtopics (topic_id, name) "
+                "SELECT id, ? FROM topics WHERE id = (" + self._TOPIC_ID + ")",
+                (path[2], path[0], path[1]))
+        elif op == "delete_subtopic":
+            self.connection.execute(
+                "DELETE FROM subtopics WHERE topic_id = (" + self._TOPIC_ID + ") AND name = ?",
+                (path[0], path[1], path[2]))
+        elif op == "set_completed":
+            self.connection.execute(
+                "UPDATE subtopics SET completed = ? WHERE topic_id = (" + self._TOPIC_ID + ") AND name = ?",
+                (int(record["value"]), path[0], path[1], path[2]))
+        else:
+            raise ValueError(f"Unknown mutation record: {op}")
+
+    def count_completed(self, subject, topic=None):
+        """
+        Return (completed, total) subtopic counts for a subject or one of its topics
+        """
+        query = (
+            "SELECT COUNT(*), COALESCE(SUM(subtopics.completed), 0) FROM subtopics "
+            "JOIN topics ON subtopics.topic_id = topics.id "
+            "JOIN subjects ON topics.subject_id = subjects.id "
+            "WHERE subjects.name = ?"
+        )
+        parameters = (subject,)
+        if topic is not None:
+            query += " AND topics.name = ?"
+            parameters += (topic,)
+        with self.lock:
+            total, completed = self.connection.execute(query, parameters).fetchone()
+            return completed, total
+
+    def completion_counts(self, include_topics=True):
+        """
+        Counts for every subject and topic from one grouped query
+        """
+        counts = {}
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT subjects.name, topics.name, COUNT(subtopics.id), "
+                "COALESCE(SUM(subtopics.completed), 0) FROM subjects "
+                "LEFT JOIN topics ON topics.subject_id = subjects.id "
+                "LEFT JOIN subtopics ON subtopics.topic_id = topics.id "
+                "GROUP BY subjects.id, topics.id ORDER BY subjects.id, topics.id").fetchall()
+
+        for subject, topic, total, completed in rows:
+            if subject not in counts:
+                counts[subject] = [0, 0, {} if include_topics else None]
+            entry = counts[subject]
+            entry[0] += completed
+            entry[1] += total
+            if include_topics and topic is not None:
+                entry[2][topic] = (completed, total)
+        return {subject: ((completed, total), topics) for subject, (completed, total, topics) in counts.items()}
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+class ShardedDocument(MutableMapping):
+    """
+    Study document whose subjects are read from their shard on first access.
+    Every read goes through __getitem__, so no caller ever sees a subject
+    that has not been loaded; iterating the names reads nothing.
+    """
+
+    def __init__(self, names, loader, summary):
+        # Subject name -> Subject, or None until the subject is first accessed
+        self._subjects = dict.fromkeys(names)
+        self._loader = loader
+        self._summary = summary
+
+    def __getitem__(self, subject):
+        value = self._subjects[subject]
+        if value is None:
+            value = self._subjects[subject] = self._loader(subject)
+        return value
+
+    def __setitem__(self, subject, value):
+        self._subjects[subject] = value
+
+    def __delitem__(self, subject):
+        del self._subjects[subject]
+
+    def __contains__(self, subject):
+        return subject in self._subjects
+
+    def __iter__(self):
+        return iter(self._subjects)
+
+    def __len__(self):
+        return len(self._subjects)
+
+    def __repr__(self):
+        loaded = sum(value is not None for value in self._subjects.values())
+        return f"<ShardedDocument {len(self)} subjects, {loaded} loaded>"
+
+    def clear(self):
+        self._subjects.clear()
+
+    def copy(self):
+        # Shallow, like dict.copy(): subjects not loaded yet stay unloaded, and
+        # loading one through either document gives both the same Subject
+        document = ShardedDocument((), self._load_shared, self._summary)
+        document._subjects = self._subjects.copy()
+        return document
+
+    def _load_shared(self, subject):
+        if subject in self._subjects:
+            return self[subject]
+        return self._loader(subject)
+
+    def insert(self, index, subject, value):
+        """
+        Put subject back at position index, e.g. to undo its deletion
+        """
+        items = list(self._subjects.items())
+        items.insert(index, (subject, value))
+        self._subjects = dict(items)
+
+    def replace(self, other):
+        """
+        Take over the contents of another ShardedDocument, keeping this object
+        """
+        self._subjects = other._subjects.copy()
+        self._loader = other._loader
+        self._summary = other._summary
+
+    def peek(self, subject):
+        """
+        Return subject, reading its shard without keeping it loaded
+        """
+        value = self._subjects[subject]
+        return self._loader(subject) if value is None else value
+
+    def is_loaded(self, subject):
+        return self._subjects.get(subject) is not None
+
+    def summary_counts(self, subject):
+        """
+        (completed, total) from the manifest, for subjects not opened yet
+        """
+        if self.is_loaded(subject):
+            return None
+        return self._summary.get(subject)
+
+
+class ShardedStorage:
+    """
+    A directory with a small manifest of subject names and counters plus one
+    JSON file per subject, so listing subjects never reads their contents
+    """
+    # Writes only need the subjects they touch, which are loaded by then
+    targeted = False
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.manifest_filename = os.path.join(directory, "manifest.json")
+        self.shard_directory = os.path.join(directory, "subjects")
+        self.lock = threading.RLock()
+        os.makedirs(self.shard_directory, exist_ok=True)
+
+        self._files = {}
+        self._summary = {}
+        self._next_id = 1
+        self._stamp = None
+
+    def _shard_path(self, subject):
+        return os.path.join(self.shard_directory, self._files[subject])
+
+    def is_stale(self):
+        with self.lock:
+            return file_stamp(self.manifest_filename) != self._stamp
+
+    def is_empty(self):
+        with self.lock:
+            self._read_manifest()
+            return not self._files
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_filename, "r") as file:
+                manifest = json.load(file)
+        except FileNotFoundError:
+            manifest = {"next_id": 1, "subjects": []}
+
+        self._next_id = manifest["next_id"]
+        self._files = {}
+        self._summary.clear()
+        for entry in manifest["subjects"]:
+            self._files[entry["name"]] = entry["file"]
+            self._summary[entry["name"]] = (entry["completed"], entry["total"])
+        return [entry["name"] for entry in manifest["subjects"]]
+
+    def _write_manifest(self, names):
+        subjects = [
+            {
+                "name": name,
+                "file": self._files[name],
+                "completed": self._summary[name][0],
+                "total": self._summary[name][1]
+            }
+            for name in names
+        ]
+        write_atomic(self.manifest_filename, json.dumps({"next_id": self._next_id, "subjects": subjects}))
+        self._stamp = file_stamp(self.manifest_filename)
+
+    def _load_shard(self, subject):
+        with self.lock:
+            try:
+                with open(self._shard_path(subject), "r") as file:
+                    return Subject.from_dict(subject, json.load(file))
+            except (KeyError, FileNotFoundError):
+                return Subject(subject)
+
+    def _write_shard(self, subject, subject_data):
+        if subject not in self._files:
+            self._files[subject] = f"{self._next_id}.json"
+            self._next_id += 1
+        write_atomic(self._shard_path(subject), json.dumps(subject_data.to_dict()))
+        self._summary[subject] = subject_data.count_completed()
+
+    def _remove_shard(self, subject):
+        filename = self._files.pop(subject, None)
+        self._summary.pop(subject, None)
+        if filename is not None:
+            try:
+                os.remove(os.path.join(self.shard_directory, filename))
+            except FileNotFoundError:
+                pass
+
+    def load(self):
+        """
+        Read the manifest only; subjects are read when first accessed
+        """
+        with self.lock:
+            stamp = file_stamp(self.manifest_filename)
+            names = self._read_manifest()
+            self._stamp = stamp
+            return ShardedDocument(names, self._load_shard, self._summary)
+
+    def save(self, data):
+        with self.lock:
+            names = list(data)
+            for subject in list(self._files):
+                if subject not in data:
+                    self._remove_shard(subject)
+            for subject, subject_data in data.items():
+                self._write_shard(subject, subject_data)
+            self._write_manifest(names)
+
+    def append(self, record, data):
+        self.append_batch([record], data)
+
+    def append_batch(self, records, data):
+        # Rewrite each touched subject's shard once, then the manifest
+        with self.lock:
+            touched = dict.fromkeys(record["path"][0] for record in records)
+            for subject in touched:
+                if subject in data:
+                    self._write_shard(subject, data[subject])
+                else:
+                    self._remove_shard(subject)
+            self._write_manifest(list(data))
+
+    def close(self):
+        pass
+
+
+SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+SHARDED_EXTENSION = ".shards"
+
+# Binary snapshot extensions and the compression each one implies
+BINARY_EXTENSIONS = {
+    ".stb": None,
+    ".stbz": "zlib",
+    ".stbx": "lzma",
+}
+
+
+def storage_format(filename):
+    """
+    Guess the storage format from a file name
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    if extension in SQLITE_EXTENSIONS:
+        return "sqlite"
+    if extension == SHARDED_EXTENSION:
+        return "shards"
+    if extension in BINARY_EXTENSIONS:
+        return "binary"
+    return "json"
+
+
+def migrate_json(json_filename, storage):
+    """
+    One-shot import of an existing study_data.json into another backend.
+    Does nothing if the backend already holds subjects.
+    """
+    try:
+        if not storage.is_empty():
+            return False
+        # The journal may hold data the snapshot never saw, so replay it too
+        source = JsonStorage(json_filename, journal=True)
+        data = source.load()
+        source.close()
+        if not data:
+            return False
+        storage.save(data)
+        return True
+    finally:
+        storage.close()
+
+
+def open_storage(filename, journal=False, compact_threshold=256 * 1024, format=None, compression=None,
+                 migrate=True):
+    """
+    Open a storage backend. The format comes from the file extension unless
+    given explicitly; a missing non-JSON store is migrated from the JSON file
+    with the same base name.
+    """
+    format = format or storage_format(filename)
+    if format == "json":
+        return JsonStorage(filename, journal=journal, compact_threshold=compact_threshold)
+
+    if format == "sqlite":
+        storage_class = SqliteStorage
+    elif format == "shards":
+        storage_class = ShardedStorage
+    elif format == "binary":
+        compression = compression or BINARY_EXTENSIONS.get(os.path.splitext(filename)[1].lower())
+
+        def storage_class(name):
+            return BinaryStorage(name, compression=compression, journal=journal,
+                                 compact_threshold=compact_threshold)
+    else:
+        raise ValueError(f"Unknown storage format: {format}")
+
+    if migrate and not os.path.exists(filename):
+        migrate_json(os.path.splitext(filename)[0] + ".json", storage_class(filename))
+    return storage_class(filename)
+
+
+def convert(source, target):
+    """
+    Copy study data between any two formats, e.g. study_data.json to study_data.stbz
+    """
+    source_storage = open_storage(source, journal=True)
+    target_storage = open_storage(target, migrate=False)
+    try:
+        target_storage.save(source_storage.load())
+    finally:
+        source_storage.close()
+        target_storage.close()
@@ -0,0 +1,239 @@
+import sys
+from array import array
+
+
+class Topic:
+    """
+    A topic and its subtopics. Subtopic names are interned and indexed by
+    position; completion flags are packed one byte each in an array.
+    Completed/total counters are kept up to date on every change and
+    forwarded to the owning subject.
+    """
+    __slots__ = ("name", "_names", "_index", "_completed", "completed_count", "subject",
+                 "extra", "subtopic_extra")
+
+    def __init__(self, name):
+        self.name = sys.intern(name)
+        self._names = []
+        self._index = {}
+        self._completed = array("b")
+        self.completed_count = 0
+        self.subject = None
+        # Keys outside the known schema, kept only so conversion stays lossless
+        self.extra = None
+        self.subtopic_extra = None
+
+    def __len__(self):
+        return len(self._names)
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def items(self):
+        """
+        Yield (subtopic name, completed) pairs in insertion order
+        """
+        return zip(self._names, map(bool, self._completed))
+
+    def is_completed(self, name):
+        return bool(self._completed[self._index[name]])
+
+    def add(self, name, completed=False, position=None, extra=None):
+        if name in self._index:
+            return False
+        name = sys.intern(name)
+        if extra:
+            if self.subtopic_extra is None:
+                self.subtopic_extra = {}
+            self.subtopic_extra[name] = extra
+        if position is None or position >= len(self._names):
+            self._index[name] = len(self._names)
+            self._names.append(name)
+            self._completed.append(bool(completed))
+        else:
+            self._names.insert(position, name)
+            self._completed.insert(position, bool(completed))
+            self._reindex(position)
+        self._adjust(int(bool(completed)), 1)
+        return True
+
+    def remove(self, name):
+        """
+        Remove a subtopic and return (position, completed, extra) so it can be restored
+        """
+        position = self._index.pop(name)
+        completed = bool(self._completed[position])
+        extra = self.subtopic_extra.pop(name, None) if self.subtopic_extra else None
+        del self._names[position]
+        del self._completed[position]
+        self._reindex(position)
+        self._adjust(-int(completed), -1)
+        return position, completed, extra
+
+    def set_completed(self, name, value):
+        """
+        Set a subtopic's flag and return the previous value
+        """
+        position = self._index[name]
+        previous = bool(self._completed[position])
+        self._completed[position] = bool(value)
+        self._adjust(int(bool(value)) - int(previous), 0)
+        return previous
+
+    def count_completed(self):
+        """
+        Return (completed, total) subtopic counts in O(1)
+        """
+        return self.completed_count, len(self._names)
+
+    def _adjust(self, completed, total):
+        self.completed_count += completed
+        if self.subject is not None:
+            self.subject.completed_count += completed
+            self.subject.total_count += total
+
+    def recount(self):
+        """
+        Recompute the counter from the flags; return True if it was wrong
+        """
+        completed = self._completed.count(1)
+        wrong = completed != self.completed_count
+        self.completed_count = completed
+        return wrong
+
+    def packed(self):
+        """
+        Return (names, flags): the subtopic names and their completion bytes
+        """
+        return self._names, self._completed
+
+    @classmethod
+    def from_packed(cls, name, names, flags):
+        """
+        Build a topic straight from a name list and an array('b') of flags
+        """
+        topic = cls(name)
+        topic._names = names
+        topic._index = dict(zip(names, range(len(names))))
+        topic._completed = flags
+        topic.completed_count = flags.count(1)
+        return topic
+
+    def _reindex(self, start):
+        for position in range(start, len(self._names)):
+            self._index[self._names[position]] = position
+
+    def to_dict(self):
+        subtopics = {}
+        for name, completed in self.items():
+            subtopic = {"completed": completed}
+            if self.subtopic_extra and name in self.subtopic_extra:
+                subtopic.update(self.subtopic_extra[name])
+            subtopics[name] = subtopic
+        data = {"subtopics": subtopics}
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    @classmethod
+    def from_dict(cls, name, data):
+        topic = cls(name)
+        for subtopic_name, subtopic in data["subtopics"].items():
+            extra = None
+            if len(subtopic) > 1:
+                extra = {key: value for key, value in subtopic.items() if key != "completed"}
+            topic.add(subtopic_name, subtopic["completed"], extra=extra)
+        if len(data) > 1:
+            topic.extra = {key: value for key, value in data.items() if key != "subtopics"}
+        return topic
+
+
+class Subject:
+    """
+    A subject and its topics, keyed by interned topic name. Topics must be
+    added through attach_topic/add_topic so the counters stay in sync.
+    """
+    __slots__ = ("name", "topics", "completed_count", "total_count", "extra")
+
+    def __init__(self, name):
+        self.name = sys.intern(name)
+        self.topics = {}
+        self.completed_count = 0
+        self.total_count = 0
+        self.extra = None
+
+    def attach_topic(self, topic):
+        topic.subject = self
+        self.topics[topic.name] = topic
+        self.completed_count += topic.completed_count
+        self.total_count += len(topic)
+
+    def add_topic(self, name):
+        if name in self.topics:
+            return False
+        self.attach_topic(Topic(name))
+        return True
+
+    def remove_topic(self, name):
+        topic = self.topics.pop(name)
+        topic.subject = None
+        self.completed_count -= topic.completed_count
+        self.total_count -= len(topic)
+        return topic
+
+    def count_completed(self):
+        """
+        Return (completed, total) subtopic counts in O(1)
+        """
+        return self.completed_count, self.total_count
+
+    def recount(self):
+        """
+        Recompute every counter from scratch; return True if any was wrong
+        """
+        wrong = False
+        completed = total = 0
+        for topic in self.topics.values():
+            wrong = topic.recount() or wrong
+            completed += topic.completed_count
+            total += len(topic)
+        wrong = wrong or (completed, total) != (self.completed_count, self.total_count)
+        self.completed_count = completed
+        self.total_count = total
+        return wrong
+
+    def to_dict(self):
+        data = {"topics": {name: topic.to_dict() for name, topic in self.topics.items()}}
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    @classmethod
+    def from_dict(cls, name, data):
+        subject = cls(name)
+        for topic_name, topic_data in data["topics"].items():
+            subject.attach_topic(Topic.from_dict(topic_name, topic_data))
+        if len(data) > 1:
+            subject.extra = {key: value for key, value in data.items() if key != "topics"}
+        return subject
+
+
+def document_from_dict(data):
+    """
+    Convert the study_data.json schema into a {name: Subject} document
+    """
+    document = {}
+    for name, subject_data in data.items():
+        subject = Subject.from_dict(name, subject_data)
+        document[subject.name] = subject
+    return document
+
+
+def document_to_dict(document):
+    """
+    Convert a {name: Subject} document back into the study_data.json schema
+    """
+    return {name: subject.to_dict() for name, subject in document.items()}
@@ -1,58 +1,112 @@
+import time
 import tkinter as tk
+from collections import deque
 from tkinter import ttk
 from progress_circle import ProgressCircle
-from topic_frame import TopicFrame
+from topic_frame import ROW_CLASSES, TopicFrame
+from virtual_list import VirtualList, pointer_within
 from add_dialog import AddDialog
 from font_manager import FontManager
+from theme import define_app_styles
 
 
-class ModernScrollFrame(ttk.Frame):
-    def __init__(self, container, *args, **kwargs):
-        super().__init__(container, *args, **kwargs)
-        self.canvas = tk.Canvas(self, bg='#ffffff', highlightthickness=0)
-        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.canvas.yview)
-        self.scrollable_frame = ttk.Frame(self.canvas)
+class ModernScrollFrame(VirtualList):
+    """
+    Virtualized list with the subject window's white background
+    """
 
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+    def __init__(self, container, create_row, bind_row, kind_of=None, **kwargs):
+        super().__init__(container, create_row, bind_row, kind_of=kind_of, bg="#ffffff", **kwargs)
+
+
+class SidebarRow(tk.Frame):
+    """
+    One subject of the sidebar. Its bindings are made once and look at the
+    sidebar's current subject when they fire, so moving the highlight only
+    recolours the row.
+    """
+    COLORS = {"current": "#BE8464", "normal": "#493428", "hover": "#7D685F"}
+
+    def __init__(self, sidebar, subject, completion):
+        super().__init__(sidebar.subject_buttons_frame)
+        self.sidebar = sidebar
+        self.subject = subject
+        self.completion = completion
+
+        self.button = tk.Label(
+            self,
+            text=subject,
+            fg="#D2DCE5",
+            font=(sidebar.font_manager.get_font(), 11),
+            padx=20,
+            pady=10,
+            cursor="hand2"
         )
+        self.button.pack(side="left", fill="x", expand=True)
 
-        self.canvas_frame = self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.canvas.bind('<Configure>', self.on_canvas_configure)
+        self.progress_label = tk.Label(
+            self,
+            text=f"{completion}%",
+            fg="#D2DCE5",
+            font=(sidebar.font_manager.get_font(), 9),
+            padx=10
+        )
+        self.progress_label.pack(side="right")
+        self.highlight()
 
-        self.canvas.pack(side="left", fill="both", expand=True)
-        self.scrollbar.pack(side="right", fill="y")
+        # Hover and wheel scrolling cover the whole row, percentage included
+        for widget in (self, self.button, self.progress_label):
+            widget.bind("<Enter>", self.on_enter)
+            widget.bind("<Leave>", self.on_leave)
+            widget.bind("<Button-1>", self.on_click)
 
-        self.canvas.configure(yscrollcommand=self.scrollbar.set)
-        self.bind_mouse_scroll()
+    @property
+    def is_current(self):
+        return self.subject == self.sidebar.current_subject
 
-    def on_canvas_configure(self, event):
-        self.canvas.itemconfig(self.canvas_frame, width=event.width)
+    def highlight(self, state="normal"):
+        # The current subject keeps its colour while hovered
+        color = self.COLORS["current" if self.is_current else state]
+        for widget in (self, self.button, self.progress_label):
+            widget.configure(bg=color)
 
-    def bind_mouse_scroll(self):
-        self.canvas.bind("<Enter>", lambda e: self.canvas.bind_all("<MouseWheel>", self._on_mousewheel))
-        self.canvas.bind("<Leave>", lambda e: self.canvas.unbind_all("<MouseWheel>"))
+    def set_completion(self, completion):
+        if completion != self.completion:
+            self.completion = completion
+            self.progress_label.configure(text=f"{completion}%")
 
-    def _on_mousewheel(self, event):
-        if self.canvas.winfo_exists():
-            self.canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
+    def on_enter(self, event):
+        self.highlight("hover")
+        self.sidebar._bind_mousewheel(event)
+
+    def on_leave(self, event):
+        # Moving between the row's own labels is not leaving the row
+        if not pointer_within(self):
+            self.highlight()
+            self.sidebar._unbind_mousewheel(event)
+
+    def on_click(self, event):
+        if not self.is_current:
+            self.sidebar.subject_callback(self.subject)
 
 
 class ModernSidebar(ttk.Frame):
-    def __init__(self, parent, current_subject, data_manager, subject_callback, return_callback):
+    def __init__(self, parent, current_subject, data_manager, progress_calculator, subject_callback,
+                 return_callback):
         super().__init__(parent)
 
         # Get font manager instance
         self.font_manager = FontManager()
         self.data_manager = data_manager
+        self.progress_calculator = progress_calculator
+        # Subject name -> SidebarRow, in display order
+        self.subject_rows = {}
+        # Data version the rows were last brought in line with
+        self.version = None
         self.subject_callback = subject_callback
         self.return_callback = return_callback
         self.current_subject = current_subject
 
-        # Configure sidebar style
-        style = ttk.Style()
-        style.configure("Sidebar.TFrame", background="#493428")
         self.configure(style="Sidebar.TFrame")
 
         # Create a canvas and scrollbar for scrolling
@@ -89,8 +143,10 @@ class ModernSidebar(ttk.Frame):
         self.canvas.bind_all("<MouseWheel>", self._on_mousewheel)
 
     def _unbind_mousewheel(self, event):
-        # Unbind the mousewheel event when mouse leaves
-        self.canvas.unbind_all("<MouseWheel>")
+        # Unbind the mousewheel event when mouse leaves the sidebar, not
+        # when it only moves onto one of the rows inside it
+        if not pointer_within(self.canvas):
+            self.canvas.unbind_all("<MouseWheel>")
 
     def _on_mousewheel(self, event):
         # Scroll the canvas when mousewheel is used
@@ -114,9 +170,7 @@ class ModernSidebar(ttk.Frame):
         self.subject_buttons_frame.pack(fill="both", expand=True)
 
         # Populate subject buttons
-        subjects = self.data_manager.load_data().keys()
-        for subject in subjects:
-            self.create_subject_button(subject)
+        self.create_subject_buttons()
 
         # Return button container (outside scrollable area)
         self.return_button_frame = ttk.Frame(self, style="Sidebar.TFrame")
@@ -124,7 +178,7 @@ class ModernSidebar(ttk.Frame):
             self.return_button_frame,
             text="Return to Main Menu",
             command=self.return_callback,
-            style="Sidebar.TButton"
+            style="ModernSidebar.TButton"
         )
         self.return_button.pack(fill="x", padx=10, pady=10)
 
@@ -133,65 +187,82 @@ class ModernSidebar(ttk.Frame):
         self.scrollbar.pack(side="right", fill="y")
         self.return_button_frame.pack(side="bottom", fill="x", before=self.canvas)
 
-    def create_subject_button(self, subject):
-        is_current = subject == self.current_subject
-        bg_color = "#BE8464" if is_current else "#493428"
-
-        button_frame = tk.Frame(self.subject_buttons_frame, bg=bg_color)
-        button_frame.pack(fill="x", pady=2)
-
-        button = tk.Label(
-            button_frame,
-            text=subject,
-            bg=bg_color,
-            fg="#D2DCE5",
-            font=(self.font_manager.get_font(), 11),
-            padx=20,
-            pady=10,
-            cursor="hand2"
-        )
-        button.pack(fill="x")
-
-        # Bind mousewheel events to the button and frame
-        button.bind("<Enter>", self._bind_mousewheel)
-        button.bind("<Leave>", self._unbind_mousewheel)
-        button_frame.bind("<Enter>", self._bind_mousewheel)
-        button_frame.bind("<Leave>", self._unbind_mousewheel)
-
-        # In hover effects
-        def on_enter(e):
-            if not is_current:
-                button_frame.configure(bg="#7D685F")
-                button.configure(bg="#7D685F")
-
-        def on_leave(e):
-            if not is_current:
-                button_frame.configure(bg="#493428")
-                button.configure(bg="#493428")
-
-        def on_click(e):
-            if not is_current:
-                self.subject_callback(subject)
-
-        button.bind("<Enter>", lambda e: [on_enter(e), self._bind_mousewheel(e)])
-        button.bind("<Leave>", lambda e: [on_leave(e), self._unbind_mousewheel(e)])
-        button.bind("<Button-1>", on_click)
-        button_frame.bind("<Button-1>", on_click)
+    def create_subject_buttons(self):
+        """
+        Bring the subject rows in line with the data. Rows are keyed by
+        subject name, so only rows that were added, removed or changed are
+        touched; the rest keep their widgets, scroll position and focus.
+        """
+        self.version = self.data_manager.version
+        # Names and percentages for every subject come from one pass over the data
+        completions = self.progress_calculator.calculate_all_completions(include_topics=False)
+
+        for subject in [subject for subject in self.subject_rows if subject not in completions]:
+            self.subject_rows.pop(subject).destroy()
+
+        # Kept rows only need repacking if their relative order changed
+        kept = [subject for subject in completions if subject in self.subject_rows]
+        if kept != list(self.subject_rows):
+            for subject in kept:
+                self.subject_rows[subject].pack_forget()
+            for subject in kept:
+                self.subject_rows[subject].pack(fill="x", pady=2)
+                self.subject_rows[subject] = self.subject_rows.pop(subject)
+
+        rows = {}
+        previous = None
+        for subject, progress in completions.items():
+            row = self.subject_rows.get(subject)
+            if row is None:
+                row = self.create_subject_button(subject, progress["percentage"], previous)
+            else:
+                row.set_completion(progress["percentage"])
+            rows[subject] = previous = row
+        self.subject_rows = rows
+
+    def create_subject_button(self, subject, completion, previous=None):
+        row = SidebarRow(self, subject, completion)
+        # Slot the row in after the one before it, so the rest stay untouched
+        rows = [] if previous is not None else self.subject_buttons_frame.pack_slaves()
+        if previous is not None:
+            row.pack(fill="x", pady=2, after=previous)
+        elif rows:
+            row.pack(fill="x", pady=2, before=rows[0])
+        else:
+            row.pack(fill="x", pady=2)
+        return row
 
     def update_subjects(self, current_subject):
+        """
+        Move the highlight to current_subject. The rows are only brought in
+        line with the data when it changed since they were last built.
+        """
+        previous = self.subject_rows.get(self.current_subject)
         self.current_subject = current_subject
-
-        # Clear existing subject buttons
-        for widget in self.subject_buttons_frame.winfo_children():
-            widget.destroy()
-
-        # Recreate subject buttons
-        subjects = self.data_manager.load_data().keys()
-        for subject in subjects:
-            self.create_subject_button(subject)
+        for row in (previous, self.subject_rows.get(current_subject)):
+            if row is not None:
+                row.highlight()
+        if self.version != self.data_manager.version:
+            self.create_subject_buttons()
+
+    def show_beside(self, widget, current_subject):
+        """
+        Pack the sidebar to the left of widget with current_subject highlighted
+        """
+        self.update_subjects(current_subject)
+        self.pack(side="left", fill="y", before=widget)
+
+    def update_completion(self, subject, completion):
+        row = self.subject_rows.get(subject)
+        if row is not None:
+            row.set_completion(completion)
 
 class SubjectWindow:
-    def __init__(self, parent, subject, data_manager, progress_calculator, return_callback):
+    # Time spent building topics per idle callback, in seconds
+    RENDER_BUDGET = 0.008
+
+    def __init__(self, parent, subject, data_manager, progress_calculator, return_callback, analytics=None,
+                 open_callback=None, sidebar=None):
         # Get font manager instance
         self.font_manager = FontManager()
         self.window = parent
@@ -199,23 +270,38 @@ class SubjectWindow:
         self.data_manager = data_manager
         self.progress_calculator = progress_calculator
         self.return_callback = return_callback
+        self.analytics = analytics
+        # When given, picking another subject in the sidebar goes through
+        # open_callback (e.g. a view cache) instead of rebuilding this window
+        self.open_callback = open_callback
+
+        self.topic_frames = {}
+        # Topics still to be built and the idle callback building them
+        self._pending = deque()
+        self._render_job = None
 
         # Create main container
         self.main_container = ttk.Frame(self.window, style="Modern.TFrame")
         self.main_container.pack(fill="both", expand=True)
 
-        # Configure styles
-        self.setup_styles()
-
-        # Setup sidebar
-        self.sidebar = ModernSidebar(
-            self.main_container,
-            self.subject,
-            self.data_manager,
-            self.switch_subject,
-            self.return_callback
-        )
-        self.sidebar.pack(side="left", fill="y")
+        # No-op when the app already defined the styles
+        define_app_styles()
+
+        # A sidebar shared with other subject windows is placed beside this
+        # one while it is shown; otherwise the window builds its own
+        self.shared_sidebar = sidebar is not None
+        if self.shared_sidebar:
+            self.sidebar = sidebar
+        else:
+            self.sidebar = ModernSidebar(
+                self.main_container,
+                self.subject,
+                self.data_manager,
+                self.progress_calculator,
+                self.switch_subject,
+                self.return_callback
+            )
+            self.sidebar.pack(side="left", fill="y")
 
         # Content area
         self.content_frame = ttk.Frame(self.main_container, style="Modern.TFrame")
@@ -224,69 +310,115 @@ class SubjectWindow:
         # Build the content area
         self.setup_ui()
 
-        # Configure styles with custom font
-        self.font_manager.configure_styles()
-
-    def setup_styles(self):
-        style = ttk.Style()
-        # Sidebar button style
-        style.configure(
-            "Sidebar.TButton",
-            padding=10,
-            font=("Helvetica", 11, "bold"),
-            background="#493428",
-            foreground="#D2DCE5"
-        )
-
-        # Modern frame style
-        style.configure("Modern.TFrame", background="#D2DCE5")
-        style.configure("Modern.TButton",
-                        padding=10,
-                        font=("Helvetica", 11),
-                        background="#BE8464",
-                        foreground="#483C32")
-        style.configure("AddTopic.TButton",
-                        padding=10,
-                        font=("Helvetica", 12, "bold"),
-                        background="#BE8464")
     def setup_ui(self):
-        # Progress circle
-        self.canvas = tk.Canvas(self.content_frame, width=200, height=200, bg="#ffffff", highlightthickness=0)
-        self.canvas.pack(pady=20)
+        # Progress circle with the forecast beside it
+        self.progress_area = ttk.Frame(self.content_frame, style="Modern.TFrame")
+        self.progress_area.pack(pady=20)
+
+        self.canvas = tk.Canvas(self.progress_area, width=200, height=200, bg="#ffffff", highlightthickness=0)
+        self.canvas.pack(side="left")
+
+        self.forecast_label = ttk.Label(
+            self.progress_area,
+            font=(self.font_manager.get_font(), 10),
+            foreground="#483C32",
+            background="#D2DCE5",
+            justify="left"
+        )
+        if self.analytics is not None:
+            self.forecast_label.pack(side="left", padx=20)
 
         self.progress_circle = ProgressCircle(self.canvas)
         self.update_progress()
 
-        # Scrollable topics area
-        self.scroll_frame = ModernScrollFrame(self.content_frame)
+        # Scrollable topics area: topics and subtopics flattened into one
+        # list, with row widgets built only for what is on screen
+        self.scroll_frame = ModernScrollFrame(
+            self.content_frame,
+            lambda parent, kind: ROW_CLASSES[kind](parent),
+            self.bind_topic_row,
+            kind_of=lambda index: self.topic_rows[index][0],
+            key_of=self.topic_row_key
+        )
         self.scroll_frame.pack(fill="both", expand=True, pady=20)
-
-        self.topics_frame = self.scroll_frame.scrollable_frame
         self.display_topics()
 
         # Add topic button
         self.create_add_topic_button()
 
     def setup_content_ui(self):
-        # Progress circle
-        self.canvas = tk.Canvas(self.content_frame, width=200, height=200, bg="#ffffff", highlightthickness=0)
-        self.canvas.pack(pady=20)
+        # Progress circle with the forecast beside it
+        self.progress_area = ttk.Frame(self.content_frame, style="Modern.TFrame")
+        self.progress_area.pack(pady=20)
+
+        self.canvas = tk.Canvas(self.progress_area, width=200, height=200, bg="#ffffff", highlightthickness=0)
+        self.canvas.pack(side="left")
+
+        self.forecast_label = ttk.Label(
+            self.progress_area,
+            font=(self.font_manager.get_font(), 10),
+            foreground="#483C32",
+            background="#D2DCE5",
+            justify="left"
+        )
+        if self.analytics is not None:
+            self.forecast_label.pack(side="left", padx=20)
 
         self.progress_circle = ProgressCircle(self.canvas)
         self.update_progress()
 
-        # Scrollable topics area
-        self.scroll_frame = ModernScrollFrame(self.content_frame)
+        # Scrollable topics area: topics and subtopics flattened into one
+        # list, with row widgets built only for what is on screen
+        self.scroll_frame = ModernScrollFrame(
+            self.content_frame,
+            lambda parent, kind: ROW_CLASSES[kind](parent),
+            self.bind_topic_row,
+            kind_of=lambda index: self.topic_rows[index][0],
+            key_of=self.topic_row_key
+        )
         self.scroll_frame.pack(fill="both", expand=True, pady=20)
-
-        self.topics_frame = self.scroll_frame.scrollable_frame
         self.display_topics()
 
         # Add topic button
         self.create_add_topic_button()
 
+    @property
+    def container(self):
+        return self.main_container
+
+    def refresh(self):
+        """
+        Bring a cached window back in line with the data after it was hidden
+        """
+        self.sidebar.update_subjects(self.subject)
+        self.display_topics()
+        self.update_progress()
+
+    def on_show(self):
+        if self.shared_sidebar:
+            self.sidebar.show_beside(self.main_container, self.subject)
+        # Finish a build that was interrupted by navigating away
+        if self._pending and self._render_job is None:
+            self._render_job = self.window.after_idle(self.render_batch)
+
+    def on_hide(self):
+        if self.shared_sidebar:
+            self.sidebar.pack_forget()
+        self.cancel_render()
+        self.progress_circle.stop()
+
+    def destroy(self):
+        self.cancel_render()
+        self.main_container.destroy()
+
     def switch_subject(self, new_subject):
+        self.cancel_render()
+        if self.open_callback is not None:
+            self.open_callback(new_subject)
+            return
+
         self.subject = new_subject
+        self.topic_frames = {}
 
         # Clear content frame
         for widget in self.content_frame.winfo_children():
@@ -301,19 +433,99 @@ class SubjectWindow:
     def update_progress(self):
         percentage = max(0, min(100, self.progress_calculator.calculate_subject_completion(self.subject)))
         self.progress_circle.draw(percentage)
+        self.sidebar.update_completion(self.subject, percentage)
+        self.update_forecast()
+
+    def update_forecast(self):
+        if self.analytics is None:
+            return
+        summary = self.analytics.summary(self.subject)
+        if summary["remaining"] <= 0:
+            forecast = "All done!"
+        elif summary["forecast"] is None:
+            forecast = "Finish date: not enough recent progress"
+        else:
+            forecast = f"Projected finish: {summary['forecast']:%b %d, %Y}"
+        self.forecast_label.config(text=(
+            f"{forecast}\n"
+            f"Velocity: {summary['velocity']:.1f} subtopics/day\n"
+            f"Streak: {summary['current_streak']} days (best {summary['longest_streak']})"
+        ))
 
     def display_topics(self):
-        data = self.data_manager.load_data()
-        for topic_name, topic_data in data[self.subject]["topics"].items():
-            TopicFrame(
-                self.topics_frame,
-                self.subject,
-                topic_name,
-                topic_data,
-                self.data_manager,
-                self.progress_calculator,
-                self.update_progress
-            )
+        """
+        Show the subject's topics. Topics already shown are kept, and the
+        others are built in batches while Tk is idle, so the rest of the
+        window paints first and stays responsive.
+        """
+        self.cancel_render()
+        topics = self.data_manager.load_document()[self.subject].topics
+        self.topic_frames = {name: self.topic_frames[name] for name in topics if name in self.topic_frames}
+        self._pending = deque(name for name in topics if name not in self.topic_frames)
+        self.layout_topics()
+        if self._pending:
+            self._render_job = self.window.after_idle(self.render_batch)
+
+    def render_batch(self):
+        self._render_job = None
+        # The budget covers working out each new topic's rows; the list then
+        # lays out only those rows, leaving the ones already built alone
+        start = len(self.topic_rows)
+        deadline = time.perf_counter() + self.RENDER_BUDGET
+        while self._pending and time.perf_counter() < deadline:
+            topic_name = self._pending.popleft()
+            topic_frame = self.topic_frames[topic_name] = self.create_topic_frame(topic_name)
+            self.topic_rows.extend(topic_frame.rows())
+        self.scroll_frame.extend(len(self.topic_rows) - start)
+
+        if self._pending:
+            self._render_job = self.window.after_idle(self.render_batch)
+            return
+
+        # Topics added while building went to the end; restore the saved order
+        topics = [name for name in self.data_manager.load_document()[self.subject].topics
+                  if name in self.topic_frames]
+        if topics != list(self.topic_frames):
+            self.topic_frames = {name: self.topic_frames[name] for name in topics}
+            self.layout_topics(changed=[])
+
+    def cancel_render(self):
+        if self._render_job is not None:
+            self.window.after_cancel(self._render_job)
+            self._render_job = None
+
+    def create_topic_frame(self, topic_name, expanded=None):
+        return TopicFrame(
+            self.subject,
+            topic_name,
+            self.data_manager,
+            self.progress_calculator,
+            self.on_topics_changed,
+            expanded=expanded
+        )
+
+    def layout_topics(self, changed=None):
+        # One (kind, topic frame, subtopic name) entry per row of the list
+        self.topic_rows = []
+        for topic_frame in self.topic_frames.values():
+            self.topic_rows.extend(topic_frame.rows())
+        self.scroll_frame.set_count(len(self.topic_rows), changed)
+
+    def topic_row_key(self, index):
+        kind, topic_frame, subtopic_name = self.topic_rows[index]
+        return kind, topic_frame.topic_name, subtopic_name
+
+    def bind_topic_row(self, row, index):
+        _, topic_frame, subtopic_name = self.topic_rows[index]
+        row.show(topic_frame, subtopic_name)
+
+    def on_topics_changed(self, layout, changed):
+        if layout:
+            self.layout_topics(changed)
+        else:
+            # Rows stay where they are; only the changed ones are redrawn
+            self.scroll_frame.refresh(changed)
+        self.update_progress()
 
     def create_add_topic_button(self):
         add_topic_btn = ttk.Button(
@@ -331,12 +543,9 @@ class SubjectWindow:
         if not topic_name:
             return
 
-        data = self.data_manager.load_data()
-        if topic_name not in data[self.subject]["topics"]:
-            data[self.subject]["topics"][topic_name] = {"subtopics": {}}
-            self.data_manager.save_data(data)
-
-            # Clear and rebuild topics display
-            for widget in self.topics_frame.winfo_children():
-                widget.destroy()
-            self.display_topics()
\ No newline at end of file
+        with self.data_manager.transaction() as txn:
+            added = txn.add_topic(self.subject, topic_name)
+        if added:
+            # Expanded so its add button shows straight away
+            self.topic_frames[topic_name] = self.create_topic_frame(topic_name, expanded=True)
+            self.layout_topics(changed=[])
\ No newline at end of file
@@ -0,0 +1,125 @@
+import os
+import sys
+
+import pytest
+
+# The application modules live next to this directory and import each other by name
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+EXPECTED = {
+    "Maths": {"topics": {"Algebra": {"subtopics": {"Groups": {"completed": True}, "Rings": {"completed": False}}}}},
+    "Physics": {"topics": {"Optics": {"subtopics": {}}}},
+}
+
+
+def fill(data_manager):
+    """
+    Write EXPECTED through data_manager in one transaction
+    """
+    with data_manager.transaction() as txn:
+        txn.add_subject("Maths")
+        txn.add_topic("Maths", "Algebra")
+        txn.add_subtopic("Maths", "Algebra", "Groups")
+        txn.add_subtopic("Maths", "Algebra", "Rings")
+        txn.set_completed("Maths", "Algebra", "Groups", True)
+        txn.add_subject("Physics")
+        txn.add_topic("Physics", "Optics")
+
+
+@pytest.fixture
+def expected():
+    return EXPECTED
+
+
+@pytest.fixture
+def filled():
+    """
+    Open filename with a DataManager, write EXPECTED into it and close it
+    """
+    from data_manager import DataManager
+
+    def create(filename, **options):
+        data_manager = DataManager(filename, **options)
+        fill(data_manager)
+        data_manager.close()
+        return filename
+    return create
+
+
+@pytest.fixture
+def data_manager(tmp_path):
+    """
+    A JSON-backed DataManager holding Maths > Algebra with three open subtopics
+    """
+    from data_manager import DataManager
+
+    data_manager = DataManager(str(tmp_path / "study.json"))
+    with data_manager.transaction() as txn:
+        txn.add_subject("Maths")
+        txn.add_topic("Maths", "Algebra")
+        for name in ("Groups", "Rings", "Fields"):
+            txn.add_subtopic("Maths", "Algebra", name)
+    yield data_manager
+    data_manager.close()
+
+
+class FakeRoot:
+    """
+    Stands in for a Tk root: after() callbacks are queued and only run when
+    the test calls run_next()
+    """
+
+    def __init__(self):
+        self.pending = {}
+        self._ids = 0
+
+    def after(self, delay, callback):
+        self._ids += 1
+        self.pending[self._ids] = (delay, callback)
+        return self._ids
+
+    def after_cancel(self, after_id):
+        self.pending.pop(after_id, None)
+
+    def run_next(self):
+        """
+        Run the oldest queued callback and return the delay it was queued with
+        """
+        after_id = min(self.pending)
+        delay, callback = self.pending.pop(after_id)
+        callback()
+        return delay
+
+    def _root(self):
+        return self
+
+    def winfo_exists(self):
+        return True
+
+
+class FakeClock:
+    """
+    Replaces the time module in a module under test, moved by advance()
+    """
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def fake_root():
+    return FakeRoot()
+
+
+@pytest.fixture
+def fake_clock():
+    return FakeClock()
@@ -0,0 +1,108 @@
+from datetime import date, datetime, time, timedelta
+
+import numpy as np
+import pytest
+
+from analytics import StudyAnalytics, _SubjectHistory
+from data_manager import DataManager
+
+
+def days_ago(days):
+    # Local noon, well clear of any day boundary
+    return datetime.combine(date.today() - timedelta(days=days), time(12)).timestamp()
+
+
+@pytest.fixture
+def data_manager(tmp_path):
+    data_manager = DataManager(str(tmp_path / "study.json"), history=True)
+    with data_manager.transaction() as txn:
+        txn.add_subject("Maths")
+        txn.add_topic("Maths", "Algebra")
+        for index in range(4):
+            txn.add_subtopic("Maths", "Algebra", f"Subtopic {index}")
+        txn.add_subject("Empty")
+    yield data_manager
+    data_manager.close()
+
+
+def log(data_manager, days, completed=True, count=1):
+    for index in range(count):
+        data_manager.history.record("Maths", "Algebra", f"Subtopic {index}", completed, timestamp=days_ago(days))
+
+
+def test_velocity_covers_the_rolling_window(data_manager):
+    log(data_manager, 10, count=5)  # Outside the 7 day window
+    log(data_manager, 3)
+    log(data_manager, 1, count=2)
+    log(data_manager, 0, completed=False)
+
+    assert StudyAnalytics(data_manager).summary("Maths")["velocity"] == pytest.approx(2 / 7)
+
+
+def test_daily_counts(data_manager):
+    log(data_manager, 2, count=3)
+    log(data_manager, 0)
+
+    first_day, counts = StudyAnalytics(data_manager).daily_counts("Maths")
+    assert first_day == date.today() - timedelta(days=2)
+    assert counts.tolist() == [3, 0, 1]
+    assert StudyAnalytics(data_manager).daily_counts("Maths", days=2)[1].tolist() == [0, 1]
+
+
+def test_streak_that_ended_yesterday_is_still_current(data_manager):
+    for days in (8, 7, 6, 2, 1):
+        log(data_manager, days)
+
+    summary = StudyAnalytics(data_manager).summary("Maths")
+    assert summary["current_streak"] == 2
+    assert summary["longest_streak"] == 3
+
+
+def test_streak_ends_after_a_day_without_completions(data_manager):
+    for days in (4, 3, 2):
+        log(data_manager, days)
+
+    summary = StudyAnalytics(data_manager).summary("Maths")
+    assert summary["current_streak"] == 0
+    assert summary["longest_streak"] == 3
+
+
+def test_forecast(data_manager):
+    analytics = StudyAnalytics(data_manager)
+    # Nothing left to do
+    assert analytics.summary("Empty")["remaining"] == 0
+    assert analytics.summary("Empty")["forecast"] == date.today()
+    # No progress to project from
+    assert analytics.summary("Maths")["velocity"] == 0
+    assert analytics.summary("Maths")["forecast"] is None
+
+    # 7 completions in the window is one a day, and 4 subtopics remain
+    for days in range(7):
+        log(data_manager, days)
+    summary = analytics.summary("Maths")
+    assert summary["remaining"] == 4
+    assert summary["forecast"] == date.today() + timedelta(days=4)
+
+
+def test_new_events_are_folded_in(data_manager):
+    analytics = StudyAnalytics(data_manager)
+    log(data_manager, 5)
+    assert analytics.summary("Maths")["longest_streak"] == 1
+
+    log(data_manager, 4)
+    log(data_manager, 3)
+    summary = analytics.summary("Maths")
+    assert summary["longest_streak"] == 3
+    assert summary["velocity"] == pytest.approx(3 / 7)
+    assert analytics.daily_counts("Maths")[1].tolist() == [1, 1, 1, 0, 0, 0]
+
+
+def test_fold_moves_the_origin_for_earlier_days():
+    # Happens when the time zone changes between folds
+    history = _SubjectHistory()
+    history.fold(np.array([100, 101]), np.array([1, 1]))
+    history.fold(np.array([98, 102]), np.array([1, 0]))
+
+    assert history.first_day == 98
+    assert history.completions.tolist() == [1, 0, 1, 1, 0]
+    assert history.net.tolist() == [1, 0, 1, 1, -1]
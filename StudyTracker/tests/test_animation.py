@@ -0,0 +1,83 @@
+import tkinter as tk
+
+import pytest
+
+import animation
+from animation import Animator, linear
+
+
+class Widget:
+    def __init__(self, root):
+        self.root = root
+        self.alive = True
+
+    def _root(self):
+        return self.root
+
+    def winfo_exists(self):
+        return self.alive
+
+
+@pytest.fixture
+def animator(fake_root, fake_clock, monkeypatch):
+    monkeypatch.setattr(animation, "time", fake_clock)
+    return Animator(fake_root, fps=50)
+
+
+def test_animation_runs_to_completion(animator, fake_root, fake_clock):
+    steps = []
+    done = []
+    animator.start(Widget(fake_root), 0.1, steps.append, easing=linear, on_done=lambda: done.append(True))
+    assert len(fake_root.pending) == 1
+
+    while fake_root.pending:
+        fake_clock.advance(0.04)
+        fake_root.run_next()
+    assert steps == pytest.approx([0.4, 0.8, 1.0])
+    assert done == [True]
+    assert animator._animations == [] and animator._keyed == {}
+
+
+def test_frames_are_capped_and_share_one_tick(animator, fake_root):
+    widget = Widget(fake_root)
+    animator.start(widget, 1, lambda progress: None)
+    animator.start(widget, 1, lambda progress: None)
+    assert len(fake_root.pending) == 1
+
+    fake_root.run_next()
+    # 50 fps leaves 20ms between frames
+    delay, _ = next(iter(fake_root.pending.values()))
+    assert delay == 20
+
+
+def test_restarting_a_key_cancels_the_running_animation(animator, fake_root, fake_clock):
+    widget = Widget(fake_root)
+    first, second = [], []
+    animator.start(widget, 1, first.append, easing=linear, key="fill")
+    animator.start(widget, 1, second.append, easing=linear, key="fill")
+
+    fake_clock.advance(0.5)
+    fake_root.run_next()
+    assert first == [] and second == [0.5]
+    assert len(animator._animations) == 1
+
+
+def test_animation_stops_with_its_widget(animator, fake_root, fake_clock):
+    widget = Widget(fake_root)
+    steps = []
+    animator.start(widget, 1, steps.append, easing=linear)
+
+    widget.alive = False
+    fake_clock.advance(0.5)
+    fake_root.run_next()
+    assert steps == [] and fake_root.pending == {}
+
+
+def test_step_error_from_a_destroyed_widget_ends_the_animation(animator, fake_root, fake_clock):
+    def step(progress):
+        raise tk.TclError("invalid command name")
+
+    done = []
+    animator.start(Widget(fake_root), 0, step, on_done=lambda: done.append(True))
+    fake_root.run_next()
+    assert done == [] and animator._animations == [] and fake_root.pending == {}
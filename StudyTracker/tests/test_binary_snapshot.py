@@ -0,0 +1,34 @@
+import pytest
+
+import binary_snapshot
+from data_manager import DataManager
+from study_model import document_from_dict, document_to_dict
+
+SAMPLE = {
+    "Maths": {"topics": {
+        "Algebra": {"subtopics": {"Groups": {"completed": True}, "Rings": {"completed": False}}},
+        "Analysis": {"subtopics": {"Limits": {"completed": False}}, "notes": "keep me"},
+    }},
+    "Physics": {"topics": {"Optics": {"subtopics": {}}}},
+}
+
+
+@pytest.mark.parametrize("name, options", [
+    ("study.stb", {}),
+    ("study.stbz", {"journal": True}),
+    ("study.stbx", {}),
+])
+def test_round_trip(tmp_path, filled, expected, name, options):
+    filename = filled(str(tmp_path / name), **options)
+
+    reopened = DataManager(filename, **options)
+    assert reopened.load_data() == expected
+    assert reopened.count_completed("Maths") == (1, 2)
+    reopened.close()
+
+
+@pytest.mark.parametrize("compression", [None, "zlib", "lzma"])
+def test_binary_snapshot_keeps_extra_keys(compression):
+    document = document_from_dict(SAMPLE)
+    restored = binary_snapshot.loads(binary_snapshot.dumps(document, compression))
+    assert document_to_dict(restored) == SAMPLE
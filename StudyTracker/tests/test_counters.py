@@ -0,0 +1,11 @@
+def test_counters_follow_every_edit(data_manager):
+    data_manager.set_completed("Maths", "Algebra", "Groups", True)
+    data_manager.set_completed("Maths", "Algebra", "Rings", True)
+    data_manager.delete_subtopic("Maths", "Algebra", "Rings")
+    data_manager.add_subtopic("Maths", "Algebra", "Modules")
+    assert data_manager.count_completed("Maths") == (1, 3)
+    assert data_manager.verify_counters() == []
+
+    data_manager.load_document()["Maths"].completed_count = 7
+    assert data_manager.verify_counters() == ["Maths"]
+    assert data_manager.count_completed("Maths") == (1, 3)
@@ -0,0 +1,21 @@
+import json
+
+from data_manager import DataManager
+
+
+def test_document_is_cached_until_the_file_changes(tmp_path, filled, expected):
+    filename = filled(str(tmp_path / "study.json"))
+    data_manager = DataManager(filename)
+    notified = []
+    data_manager.subscribe(notified.append)
+
+    document = data_manager.load_document()
+    assert data_manager.load_document() is document
+    assert notified == []
+
+    # Written behind the DataManager's back, e.g. by another instance
+    with open(filename, "w") as file:
+        json.dump({"History": {"topics": {}}}, file)
+    assert list(data_manager.load_document()) == ["History"]
+    assert notified == [None]
+    data_manager.close()
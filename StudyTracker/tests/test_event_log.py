@@ -0,0 +1,18 @@
+from event_log import EventLog
+
+
+def test_event_log_queries_and_reload(tmp_path):
+    filename = str(tmp_path / "study.json.events")
+    log = EventLog(filename)
+    log.record("Maths", "Algebra", "Groups", True, timestamp=100)
+    log.record("Physics", "Optics", "Lenses", True, timestamp=200)
+    log.record("Maths", "Algebra", "Groups", False, timestamp=300)
+    log.close()
+
+    log = EventLog(filename)
+    assert len(log) == 3
+    assert log.count("Maths") == 2
+    assert log.count(start=150, end=300) == 2
+    assert [event.completed for event in log.query("Maths")] == [True, False]
+    assert log.query("Maths", topic="Optics") == []
+    log.close()
@@ -0,0 +1,37 @@
+import json
+import os
+
+import pytest
+
+from data_manager import DataManager
+from storage import JsonStorage
+
+
+@pytest.mark.parametrize("journal", [False, True])
+def test_round_trip(tmp_path, filled, expected, journal):
+    filename = filled(str(tmp_path / "study.json"), journal=journal)
+
+    reopened = DataManager(filename, journal=journal)
+    assert reopened.load_data() == expected
+    assert reopened.count_completed("Maths") == (1, 2)
+    reopened.close()
+
+
+def test_journal_replay_skips_torn_tail(tmp_path, filled, expected):
+    filename = filled(str(tmp_path / "study.json"), journal=True)
+    assert os.path.exists(filename + ".journal")
+
+    with open(filename + ".journal", "ab") as file:
+        file.write(b'{"op": "add_subject", "pa')
+
+    assert DataManager(filename, journal=True).load_data() == expected
+
+
+def test_journal_compaction_folds_into_snapshot(tmp_path, filled, expected):
+    filename = str(tmp_path / "study.json")
+    filled(filename, storage=JsonStorage(filename, journal=True, compact_threshold=1))
+
+    with open(filename) as file:
+        assert json.load(file) == expected
+    assert os.path.getsize(filename + ".journal") == 0
+    assert DataManager(filename, journal=True).load_data() == expected
@@ -0,0 +1,17 @@
+from progress_calc import ProgressCalculator
+
+
+def test_progress_memo_is_invalidated_by_changes(data_manager):
+    calculator = ProgressCalculator(data_manager)
+    assert calculator.calculate_topic_completion("Maths", "Algebra") == 0
+    assert calculator.calculate_overall_completion() == 0
+
+    data_manager.set_completed("Maths", "Algebra", "Groups", True)
+    assert calculator.calculate_topic_completion("Maths", "Algebra") == 33
+    assert calculator.calculate_subject_completion("Maths") == 33
+    assert calculator.calculate_overall_completion() == 33
+
+    data_manager.add_subject("Physics")
+    completions = calculator.calculate_all_completions()
+    assert completions["Physics"] == {"percentage": 0, "topics": {}}
+    assert completions["Maths"]["topics"] == {"Algebra": 33}
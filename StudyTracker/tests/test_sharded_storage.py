@@ -0,0 +1,47 @@
+import pytest
+
+from data_manager import DataManager
+from storage import ShardedDocument
+
+
+def test_round_trip(tmp_path, filled, expected):
+    filename = filled(str(tmp_path / "study.shards"))
+
+    reopened = DataManager(filename)
+    assert reopened.load_data() == expected
+    assert reopened.count_completed("Maths") == (1, 2)
+    reopened.close()
+
+
+def test_sharded_document_loads_subjects_lazily(tmp_path, filled, expected):
+    filename = filled(str(tmp_path / "study.shards"))
+
+    data_manager = DataManager(filename)
+    document = data_manager.load_document()
+    assert isinstance(document, ShardedDocument)
+    assert list(document) == ["Maths", "Physics"] and "Maths" in document
+
+    # Counts come from the manifest and exports do not load the live document
+    assert data_manager.count_completed("Maths") == (1, 2)
+    assert data_manager.load_data() == expected
+    assert not document.is_loaded("Maths")
+
+    # Every read API hands out subjects, never placeholders
+    assert document.get("Maths").count_completed() == (1, 2)
+    assert all(subject is not None for subject in document.values())
+    assert document.setdefault("Physics").name == "Physics"
+    copy = document.copy()
+    assert copy == document and copy["Maths"] is document["Maths"]
+
+
+def test_sharded_subject_deletion_rolls_back_in_place(tmp_path, filled):
+    filename = filled(str(tmp_path / "study.shards"))
+
+    data_manager = DataManager(filename)
+    with pytest.raises(RuntimeError):
+        with data_manager.transaction() as txn:
+            txn.delete_subject("Maths")
+            raise RuntimeError
+    document = data_manager.load_document()
+    assert list(document) == ["Maths", "Physics"]
+    assert not document.is_loaded("Physics")
@@ -0,0 +1,35 @@
+import json
+
+from data_manager import DataManager
+from storage import SqliteStorage, open_storage
+from study_model import document_to_dict
+
+
+def test_round_trip(tmp_path, filled, expected):
+    filename = filled(str(tmp_path / "study.db"))
+
+    reopened = DataManager(filename)
+    assert reopened.load_data() == expected
+    assert reopened.count_completed("Maths") == (1, 2)
+    reopened.close()
+
+
+def test_counts_come_from_sql_before_the_first_load(tmp_path, filled):
+    filename = filled(str(tmp_path / "study.db"))
+
+    data_manager = DataManager(filename)
+    assert data_manager.count_completed("Maths") == (1, 2)
+    assert data_manager.completion_counts()["Maths"] == ((1, 2), {"Algebra": (1, 2)})
+    assert data_manager._data is None
+    data_manager.close()
+
+
+def test_migrates_json_into_sqlite(tmp_path, expected):
+    with open(tmp_path / "study.json", "w") as file:
+        json.dump(expected, file)
+
+    storage = open_storage(str(tmp_path / "study.db"))
+    assert isinstance(storage, SqliteStorage)
+    assert document_to_dict(storage.load()) == expected
+    assert storage.count_completed("Maths", "Algebra") == (1, 2)
+    storage.close()
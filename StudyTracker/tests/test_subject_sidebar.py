@@ -0,0 +1,81 @@
+import sys
+
+import pytest
+
+if sys.platform != "win32":
+    # font_manager loads the custom font through the Windows API
+    pytest.skip("subject_window needs Windows", allow_module_level=True)
+
+from subject_window import ModernSidebar, SubjectWindow
+
+
+class FakeRow:
+    def __init__(self):
+        self.highlights = 0
+
+    def highlight(self, state="normal"):
+        self.highlights += 1
+
+
+class FakeDataManager:
+    version = 1
+
+
+class FakeSidebar:
+    def __init__(self):
+        self.calls = []
+
+    def show_beside(self, widget, subject):
+        self.calls.append(("show", widget, subject))
+
+    def pack_forget(self):
+        self.calls.append(("hide",))
+
+
+class FakeProgressCircle:
+    def stop(self):
+        pass
+
+
+def make_sidebar(current):
+    sidebar = ModernSidebar.__new__(ModernSidebar)
+    sidebar.data_manager = FakeDataManager()
+    sidebar.version = FakeDataManager.version
+    sidebar.current_subject = current
+    sidebar.subject_rows = {name: FakeRow() for name in ("Maths", "Physics", "History")}
+    sidebar.create_subject_buttons = lambda: (_ for _ in ()).throw(AssertionError("rebuilt"))
+    return sidebar
+
+
+def test_switching_subject_only_recolours_two_rows():
+    sidebar = make_sidebar("Maths")
+    sidebar.update_subjects("Physics")
+
+    assert sidebar.current_subject == "Physics"
+    rows = sidebar.subject_rows
+    assert (rows["Maths"].highlights, rows["Physics"].highlights, rows["History"].highlights) == (1, 1, 0)
+
+
+def test_subject_windows_place_the_shared_sidebar():
+    sidebar = FakeSidebar()
+    windows = []
+    for subject in ("Maths", "Physics"):
+        window = SubjectWindow.__new__(SubjectWindow)
+        window.subject = subject
+        window.shared_sidebar = True
+        window.sidebar = sidebar
+        window.main_container = f"{subject} container"
+        window._pending = []
+        window._render_job = None
+        window.progress_circle = FakeProgressCircle()
+        windows.append(window)
+
+    # What ViewManager does when the sidebar switches from Maths to Physics
+    windows[0].on_show()
+    windows[0].on_hide()
+    windows[1].on_show()
+    assert sidebar.calls == [
+        ("show", "Maths container", "Maths"),
+        ("hide",),
+        ("show", "Physics container", "Physics"),
+    ]
@@ -0,0 +1,70 @@
+import tkinter as tk
+
+import pytest
+
+import tick_scheduler
+from tick_scheduler import TickScheduler
+
+
+@pytest.fixture
+def scheduler(fake_root, fake_clock, monkeypatch):
+    monkeypatch.setattr(tick_scheduler, "time", fake_clock)
+    return TickScheduler(fake_root)
+
+
+def test_ticks_follow_the_wall_clock_without_drifting(scheduler, fake_root, fake_clock):
+    fake_clock.now = 1000.3
+    pushed = []
+    scheduler.subscribe("clock", lambda: int(fake_clock.time()), pushed.append)
+    assert pushed == [1000]
+
+    # The first tick is due just after the next whole second; run it 45ms late
+    fake_clock.advance(0.75)
+    assert fake_root.run_next() == 705
+    assert pushed == [1000, 1001]
+
+    # The next one is still due at the following second
+    delay, _ = next(iter(fake_root.pending.values()))
+    assert delay == 955
+
+
+def test_pushes_only_changed_values(scheduler, fake_root):
+    values = iter([1, 1, 2])
+    pushed = []
+    scheduler.subscribe("timer", lambda: next(values), pushed.append)
+    fake_root.run_next()
+    fake_root.run_next()
+    assert pushed == [1, 2]
+
+
+def test_subscribing_a_key_again_replaces_it(scheduler, fake_root):
+    first, second = [], []
+    scheduler.subscribe("clock", lambda: "a", first.append)
+    scheduler.subscribe("clock", lambda: "b", second.append)
+    assert len(fake_root.pending) == 1
+
+    assert first == ["a"] and second == ["b"]
+    assert list(scheduler._subscribers) == ["clock"]
+
+
+def test_paused_subscribers_stop_the_tick(scheduler, fake_root):
+    values = iter(range(10))
+    pushed = []
+    scheduler.subscribe("timer", lambda: next(values), pushed.append)
+    scheduler.pause("timer")
+    fake_root.run_next()
+    assert pushed == [0] and fake_root.pending == {}
+
+    scheduler.resume("timer")
+    assert pushed == [0, 1] and len(fake_root.pending) == 1
+
+
+def test_destroyed_widget_unsubscribes(scheduler, fake_root):
+    def push(value):
+        if value:
+            raise tk.TclError("invalid command name")
+
+    values = iter([0, 1])
+    scheduler.subscribe("clock", lambda: next(values), push)
+    fake_root.run_next()
+    assert scheduler._subscribers == {} and fake_root.pending == {}
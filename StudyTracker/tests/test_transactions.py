@@ -0,0 +1,40 @@
+import pytest
+
+
+def test_transaction_rolls_back_on_error(data_manager):
+    before = data_manager.load_data()
+    with pytest.raises(ValueError):
+        with data_manager.transaction() as txn:
+            txn.set_completed("Maths", "Algebra", "Groups", True)
+            txn.delete_subtopic("Maths", "Algebra", "Rings")
+            txn.add_subject("Physics")
+            raise ValueError
+    assert data_manager.load_data() == before
+    assert data_manager.count_completed("Maths") == (0, 3)
+
+
+def test_nested_transaction_is_a_savepoint(data_manager):
+    with data_manager.transaction() as txn:
+        txn.set_completed("Maths", "Algebra", "Groups", True)
+        with pytest.raises(KeyError):
+            with data_manager.transaction() as inner:
+                inner.set_completed("Maths", "Algebra", "Rings", True)
+                raise KeyError
+    assert data_manager.count_completed("Maths", "Algebra") == (1, 3)
+    # Subtopic order survives deleting and restoring
+    with pytest.raises(ValueError):
+        with data_manager.transaction() as txn:
+            txn.delete_subtopic("Maths", "Algebra", "Rings")
+            raise ValueError
+    assert list(data_manager.load_document()["Maths"].topics["Algebra"]) == ["Groups", "Rings", "Fields"]
+
+
+def test_failed_write_rolls_back(data_manager):
+    def fail(records, data):
+        raise OSError("disk full")
+    data_manager.storage.append_batch = fail
+
+    with pytest.raises(OSError):
+        data_manager.add_subject("Physics")
+    assert "Physics" not in data_manager.load_document()
+    assert data_manager._transaction is None
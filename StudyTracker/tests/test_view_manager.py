@@ -0,0 +1,98 @@
+from types import SimpleNamespace
+
+import pytest
+
+from view_manager import ViewManager
+
+
+class Container:
+    def __init__(self):
+        self.packed = False
+
+    def pack(self, **options):
+        self.packed = True
+
+    def pack_forget(self):
+        self.packed = False
+
+    def tkraise(self):
+        pass
+
+
+class View:
+    def __init__(self, name):
+        self.name = name
+        self.container = Container()
+        self.calls = []
+
+    def refresh(self):
+        self.calls.append("refresh")
+
+    def on_show(self):
+        self.calls.append("show")
+
+    def on_hide(self):
+        self.calls.append("hide")
+
+    def destroy(self):
+        self.calls.append("destroy")
+
+
+@pytest.fixture
+def data_manager():
+    return SimpleNamespace(version=0)
+
+
+@pytest.fixture
+def views(data_manager):
+    return ViewManager(data_manager, max_subject_views=2)
+
+
+def test_views_are_built_once_and_swapped(views):
+    menu = views.show("menu", lambda: View("menu"))
+    maths = views.show(("subject", "Maths"), lambda: View("Maths"))
+    assert views.show("menu", lambda: View("other")) is menu
+    assert menu.container.packed and not maths.container.packed
+    assert menu.calls == ["show", "hide", "show"]
+    assert maths.calls == ["show", "hide"]
+
+
+def test_refresh_only_when_the_data_changed_while_hidden(views, data_manager):
+    menu = views.show("menu", lambda: View("menu"))
+    # Changes while a view is on screen are its own to show
+    data_manager.version += 1
+    views.show(("subject", "Maths"), lambda: View("Maths"))
+    views.show("menu", lambda: View("menu"))
+    assert "refresh" not in menu.calls
+
+    views.show(("subject", "Maths"), lambda: View("Maths"))
+    data_manager.version += 1
+    views.show("menu", lambda: View("menu"))
+    assert menu.calls.count("refresh") == 1
+
+
+def test_least_recently_shown_subject_is_evicted(views):
+    built = {}
+
+    def build(name):
+        built[name] = View(name)
+        return built[name]
+
+    views.show("menu", lambda: build("menu"))
+    for name in ("Maths", "Physics", "Maths", "History"):
+        views.show(("subject", name), lambda: build(name))
+
+    assert ("subject", "Physics") not in views.views
+    assert built["Physics"].calls[-1] == "destroy"
+    assert list(views.views) == ["menu", ("subject", "Maths"), ("subject", "History")]
+    assert "destroy" not in built["menu"].calls
+
+
+def test_discarding_the_current_view_destroys_it_once_hidden(views):
+    maths = views.show(("subject", "Maths"), lambda: View("Maths"))
+    views.discard(("subject", "Maths"))
+    assert "destroy" not in maths.calls
+
+    views.show("menu", lambda: View("menu"))
+    assert maths.calls == ["show", "hide", "destroy"]
+    assert ("subject", "Maths") not in views.views
@@ -0,0 +1,45 @@
+import time
+
+import pytest
+
+from data_manager import DataManager
+
+
+def fail(records, data):
+    raise OSError("disk full")
+
+
+def test_write_behind_survives_a_failed_write(tmp_path):
+    filename = str(tmp_path / "study.json")
+    data_manager = DataManager(filename, write_behind=True, debounce=0.01)
+    append_batch = data_manager.storage.append_batch
+
+    data_manager.storage.append_batch = fail
+    data_manager.add_subject("Maths")
+    time.sleep(0.2)
+    assert isinstance(data_manager.write_error, OSError)
+    assert data_manager._writer.is_alive()
+
+    data_manager.storage.append_batch = append_batch
+    data_manager.close()
+    assert data_manager.write_error is None
+    assert list(DataManager(filename).load_document()) == ["Maths"]
+
+
+def test_flush_keeps_mutations_queued_on_failure(tmp_path):
+    filename = str(tmp_path / "study.json")
+    data_manager = DataManager(filename, write_behind=True, debounce=60)
+    append_batch = data_manager.storage.append_batch
+    data_manager.add_subject("Maths")
+    data_manager.add_topic("Maths", "Algebra")
+
+    data_manager.storage.append_batch = fail
+    with pytest.raises(OSError):
+        data_manager.flush()
+    assert len(data_manager._pending) == 2
+
+    data_manager.storage.append_batch = append_batch
+    data_manager.flush()
+    assert data_manager._pending == []
+    data_manager.close()
+    assert DataManager(filename).load_data() == {"Maths": {"topics": {"Algebra": {"subtopics": {}}}}}
@@ -0,0 +1,179 @@
+from tkinter import ttk
+
+from font_manager import FontManager
+
+
+class StyleRegistry:
+    """
+    Single owner of every ttk style. Each style option is configured once;
+    defining it again with the same value is a no-op, and a different value
+    is reported as a conflict instead of silently restyling every widget.
+    """
+    _instance = None
+
+    # Raise on conflicting definitions instead of only recording them; for development
+    strict = False
+
+    def __new__(cls):
+        if not cls._instance:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, 'initialized'):
+            self.styles = {}
+            self.conflicts = []
+            self.applied = 0  # configure calls made
+            self.avoided = 0  # configure calls skipped because nothing changed
+            self.initialized = True
+
+    def define(self, name, **options):
+        existing = self.styles.setdefault(name, {})
+        new = {}
+        for option, value in options.items():
+            if option not in existing:
+                new[option] = value
+            elif existing[option] != value:
+                if self.strict:
+                    raise ValueError(f"Style conflict: {name} {option} is {existing[option]!r}, "
+                                     f"not {value!r}")
+                # The first definition wins
+                self.conflicts.append((name, option, existing[option], value))
+
+        if new:
+            ttk.Style().configure(name, **new)
+            existing.update(new)
+            self.applied += 1
+        else:
+            self.avoided += 1
+
+    def define_all(self, styles):
+        for name, options in styles.items():
+            self.define(name, **options)
+
+    def report(self):
+        """
+        Return how the styles were configured, with every conflicting
+        definition as (style, option, kept value, rejected value)
+        """
+        return {
+            "styles": len(self.styles),
+            "applied": self.applied,
+            "avoided": self.avoided,
+            "conflicts": list(self.conflicts),
+        }
+
+
+def app_styles(font):
+    # Every style the application uses, by the screen that uses it
+    return {
+        # General
+        "TLabel": {"font": (font, 10)},
+        "TButton": {"font": (font, 10)},
+        "Clock.TLabel": {"font": (font, 48)},
+        "Header.TLabel": {"font": (font, 14, "bold")},
+        "Topic.TLabel": {"font": (font, 12)},
+        "Subtopic.TLabel": {"font": (font, 10)},
+        "Topic.TLabelframe.Label": {"font": (font, 12, "bold")},
+
+        # Main menu
+        "Content.TFrame": {"background": "#D2DCE5"},  # Light blue-gray
+        "Sidebar.TFrame": {"background": "#493428"},  # Dark brown
+        "Sidebar.TButton": {
+            "padding": 10,
+            "font": (font, 11, "bold"),
+            "background": "#BE8464",  # Light brown
+            "foreground": "#483C32",  # Dark taupe
+        },
+        "Sidebar.TLabel": {
+            "background": "#493428",
+            "foreground": "#D2DCE5",
+            "font": (font, 14, "bold"),
+        },
+        "AddButton.TButton": {
+            "background": "#BE8464",
+            "foreground": "#483C32",
+            "font": (font, 14, "bold"),
+            "padding": (10, 5),
+        },
+        "Spotify.TButton": {
+            "padding": 5,
+            "font": (font, 10),
+            "background": "#1DB954",  # Spotify green
+        },
+        "Playback.TButton": {"padding": 5, "font": (font, 10)},
+        "Subject.TButton": {"font": (font, 11)},
+
+        # Subject window
+        "ModernSidebar.TButton": {
+            "padding": 10,
+            "font": (font, 11, "bold"),
+            "background": "#493428",
+            "foreground": "#D2DCE5",
+        },
+        "Modern.TFrame": {"background": "#D2DCE5"},
+        "Modern.TButton": {
+            "padding": 10,
+            "font": ("Helvetica", 11),
+            "background": "#BE8464",
+            "foreground": "#483C32",
+        },
+        "AddTopic.TButton": {
+            "padding": 10,
+            "font": (font, 12, "bold"),
+            "background": "#BE8464",
+        },
+
+        # Topic rows
+        "Topic.TFrame": {"background": "#D2DCE5"},
+        "TopicHeader.TLabel": {
+            "font": (font, 12, "bold"),
+            "foreground": "#483C32",
+            "background": "#D2DCE5",
+        },
+        "AddSubtopic.TButton": {
+            "padding": (15, 8),
+            "font": (font, 10),
+            "background": "#BE8464",
+            "foreground": "#483C32",
+        },
+        "Delete.TButton": {
+            "padding": 5,
+            "font": (font, 8),
+            "background": "#D2DCE5",
+            "foreground": "#7D685F",
+        },
+        "Subtopic.TCheckbutton": {
+            "background": "#D2DCE5",
+            "font": (font, 10),
+        },
+
+        # Add dialog
+        "Dialog.TFrame": {"background": "#D2DCE5"},
+        "Dialog.TLabel": {
+            "background": "#D2DCE5",
+            "foreground": "#483C32",
+            "font": (font, 12),
+        },
+        "Dialog.TEntry": {
+            "fieldbackground": "#D2DCE5",
+            "padding": 5,
+            "font": (font, 10),
+        },
+        "Dialog.TButton": {
+            "padding": (20, 10),
+            "background": "#BE8464",
+            "foreground": "#483C32",
+            "font": (font, 10),
+        },
+    }
+
+
+def define_app_styles():
+    """
+    Define every style of the application. Safe to call from any screen:
+    after the first call it changes nothing.
+    """
+    registry = StyleRegistry()
+    registry.define_all(app_styles(FontManager().get_font()))
+    return registry
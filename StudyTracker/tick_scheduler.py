@@ -0,0 +1,109 @@
+"""
+One shared tick per Tk root for clocks and timers.
+
+Ticks are scheduled against monotonic deadlines, so they do not drift the
+way a chain of after(1000) calls does, and they land just after each
+wall-clock second so a clock flips on time. Subscribers are keyed: a
+second subscribe() with the same key replaces the first instead of
+starting another chain.
+"""
+import time
+import tkinter as tk
+
+
+class _Subscriber:
+    __slots__ = ("value", "push", "last", "paused")
+
+    def __init__(self, value, push):
+        self.value = value
+        self.push = push
+        self.last = None
+        self.paused = False
+
+
+class TickScheduler:
+    """
+    One per Tk root, see TickScheduler.for_widget()
+    """
+    _instances = {}
+
+    # How long after the wall-clock boundary a tick fires
+    SLACK = 0.005
+
+    @classmethod
+    def for_widget(cls, widget):
+        root = widget._root()
+        scheduler = cls._instances.get(root)
+        if scheduler is None:
+            scheduler = cls._instances[root] = cls(root)
+        return scheduler
+
+    def __init__(self, root, interval=1.0):
+        self.root = root
+        self.interval = interval
+        self._subscribers = {}
+        self._after_id = None
+        self._deadline = None
+
+    def subscribe(self, key, value, push):
+        """
+        On every tick call value() and, when the result differs from the
+        last one pushed, push(result). Pushes once right away.
+        """
+        subscriber = self._subscribers[key] = _Subscriber(value, push)
+        self._update(key, subscriber)
+        self._schedule()
+
+    def unsubscribe(self, key):
+        self._subscribers.pop(key, None)
+
+    def pause(self, key):
+        """
+        Stop ticking a subscriber, e.g. while its view is hidden
+        """
+        subscriber = self._subscribers.get(key)
+        if subscriber is not None:
+            subscriber.paused = True
+
+    def resume(self, key):
+        subscriber = self._subscribers.get(key)
+        if subscriber is not None and subscriber.paused:
+            subscriber.paused = False
+            self._update(key, subscriber)
+            self._schedule()
+
+    def _active(self):
+        return any(not subscriber.paused for subscriber in self._subscribers.values())
+
+    def _update(self, key, subscriber):
+        value = subscriber.value()
+        if value == subscriber.last:
+            return
+        try:
+            subscriber.push(value)
+        except tk.TclError:
+            # Its widget has been destroyed
+            if self._subscribers.get(key) is subscriber:
+                del self._subscribers[key]
+            return
+        subscriber.last = value
+
+    def _schedule(self):
+        if self._after_id is not None or not self._active():
+            return
+
+        now = time.monotonic()
+        if self._deadline is None or self._deadline <= now:
+            # Start, or resync after a stall, on the next wall-clock boundary
+            self._deadline = now + self.interval - time.time() % self.interval + self.SLACK
+        self._after_id = self.root.after(max(1, round((self._deadline - now) * 1000)), self._tick)
+
+    def _tick(self):
+        self._after_id = None
+        for key, subscriber in list(self._subscribers.items()):
+            if not subscriber.paused:
+                self._update(key, subscriber)
+
+        # The next deadline follows from the last one, not from when this tick ran
+        self._deadline += self.interval
+        self._schedule()
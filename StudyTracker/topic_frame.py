@@ -1,149 +1,178 @@
 import tkinter as tk
 from tkinter import ttk
 from add_dialog import AddDialog
-from font_manager import FontManager
 
 
 class TopicFrame:
-    def __init__(self, parent, subject, topic_name, topic_data, data_manager,
-                 progress_calculator, update_callback):
-
-        self.font_manager = FontManager()
-        # Get font manager instance
-        self.style = ttk.Style()
-        self.setup_styles()  # Add this line
-
-        # Configure styles with custom font
-        self.style.configure(
-            "Topic.TLabelframe",
-            background="#ffffff",
-            padding=15
-        )
-        self.style.configure(
-            "Topic.TLabelframe.Label",
-            font=(self.font_manager.get_font(), 12, "bold"),
-            foreground="#2c3e50",
-            background="#ffffff"
-        )
-
-        self.frame = ttk.LabelFrame(
-            parent,
-            text=topic_name,
-            style="Topic.TLabelframe"
-        )
-        self.frame.pack(fill="x", padx=5, pady=5)
-
+    """
+    One topic of the subject window. The topic is shown as rows of a
+    flattened, virtualized list (a header, one row per subtopic and an add
+    button); this object supplies those rows and handles their actions.
+
+    Topics start collapsed to their header, so no subtopic rows exist until
+    a topic is expanded. Whether a topic is expanded is remembered for the
+    rest of the session, across subject switches and rebuilt windows.
+    """
+    # (subject, topic name) of every expanded topic
+    expanded_topics = set()
+
+    def __init__(self, subject, topic_name, data_manager, progress_calculator, update_callback, expanded=None):
         self.subject = subject
         self.topic_name = topic_name
         self.data_manager = data_manager
         self.progress_calculator = progress_calculator
+        # Called as update_callback(layout, changed) after a change: layout is
+        # True when rows were added or removed, changed lists the row keys to redraw
         self.update_callback = update_callback
+        # Topic object and the data version it was looked up at
+        self._topic = None
+        self._topic_version = None
+        if expanded is not None:
+            self.set_expanded(expanded)
+
+    def topic_data(self):
+        # Looked up again only after the data changed (a reload bumps the
+        # version too), so binding rows never goes back to storage
+        if self._topic_version != self.data_manager.version:
+            self._topic = self.data_manager.load_document()[self.subject].topics[self.topic_name]
+            self._topic_version = self.data_manager.version
+        return self._topic
+
+    def rows(self):
+        """
+        Return this topic's (kind, topic frame, subtopic name) list items.
+        (kind, topic name, subtopic name) is the key of each row.
+        """
+        if not self.expanded:
+            return [("topic", self, None)]
+        return [
+            ("topic", self, None),
+            *(("subtopic", self, subtopic_name) for subtopic_name in self.topic_data()),
+            ("add", self, None),
+        ]
+
+    @property
+    def expanded(self):
+        return (self.subject, self.topic_name) in self.expanded_topics
+
+    def set_expanded(self, expanded):
+        if expanded:
+            self.expanded_topics.add((self.subject, self.topic_name))
+        else:
+            self.expanded_topics.discard((self.subject, self.topic_name))
+
+    def toggle(self):
+        self.set_expanded(not self.expanded)
+        self.update_callback(True, [self.header_key()])
+
+    def header_key(self):
+        return ("topic", self.topic_name, None)
+
+    def subtopic_key(self, subtopic_name):
+        return ("subtopic", self.topic_name, subtopic_name)
+
+    def header_text(self):
+        percentage = self.progress_calculator.calculate_topic_completion(self.subject, self.topic_name)
+        return f"{self.topic_name}  ({percentage}%)"
+
+    def is_completed(self, subtopic_name):
+        return self.topic_data().is_completed(subtopic_name)
 
-        self.setup_styles()
-        self.display_subtopics(topic_data)
-        self.create_add_subtopic_button()
+    def add_subtopic(self):
+        AddDialog("Add Subtopic", "Enter subtopic name:", self.add_subtopic_callback)
 
-    def setup_styles(self):
-        self.style.configure(
-            "Topic.TLabelframe",
-            background="#D2DCE5",
-            padding=15
-        )
-        self.style.configure(
-            "Topic.TLabelframe.Label",
-            font=(self.font_manager.get_font(), 12, "bold"),
-            foreground="#483C32",
-            background="#D2DCE5"
-        )
+    def add_subtopic_callback(self, subtopic_name):
+        if not subtopic_name:
+            return
 
-        # Configure styles for all buttons
-        self.style.configure(
-            "AddSubtopic.TButton",
-            padding=(15, 8),
-            font=(self.font_manager.get_font(), 10),
-            background="#BE8464",
-            foreground="#483C32"
-        )
+        with self.data_manager.transaction() as txn:
+            added = txn.add_subtopic(self.subject, self.topic_name, subtopic_name)
+        if added:
+            self.update_callback(True, [self.header_key()])
 
-        self.style.configure(
-            "Delete.TButton",
-            padding=5,
-            font=(self.font_manager.get_font(), 8),
-            background="#D2DCE5",
-            foreground="#7D685F"
-        )
+    def delete_subtopic(self, subtopic_name):
+        with self.data_manager.transaction() as txn:
+            txn.delete_subtopic(self.subject, self.topic_name, subtopic_name)
+        self.update_callback(True, [self.header_key()])
 
-        self.style.configure(
-            "Subtopic.TCheckbutton",
-            background="#D2DCE5",
-            font=(self.font_manager.get_font(), 10)
-        )
-    def display_subtopics(self, topic_data):
-        self.subtopics_frame = ttk.Frame(self.frame)
-        self.subtopics_frame.pack(fill="x", expand=True)
+    def on_checkbox_click(self, subtopic_name, value):
+        # Update the completion status of the subtopic
+        self.data_manager.set_completed(self.subject, self.topic_name, subtopic_name, value)
+
+        # Trigger a callback to update the topic header and progress circle
+        self.update_callback(False, [self.header_key(), self.subtopic_key(subtopic_name)])
+
+
+class TopicHeaderRow(ttk.Frame):
+    def __init__(self, parent):
+        super().__init__(parent, style="Topic.TFrame", padding=(15, 15, 15, 5))
+        self.topic_frame = None
 
-        for subtopic_name, subtopic_data in topic_data["subtopics"].items():
-            self.create_subtopic_frame(subtopic_name, subtopic_data)
+        self.arrow = ttk.Label(self, style="TopicHeader.TLabel", width=2, cursor="hand2")
+        self.arrow.pack(side="left")
+        self.label = ttk.Label(self, style="TopicHeader.TLabel", cursor="hand2")
+        self.label.pack(side="left")
 
-    def create_subtopic_frame(self, subtopic_name, subtopic_data):
-        frame = ttk.Frame(self.subtopics_frame)
-        frame.pack(fill="x", padx=5, pady=2)
+        # Clicking anywhere on the header expands or collapses the topic shown at that moment
+        for widget in (self, self.arrow, self.label):
+            widget.bind("<Button-1>", lambda e: self.topic_frame.toggle())
 
-        var = tk.BooleanVar(value=subtopic_data["completed"])
+    def show(self, topic_frame, subtopic_name):
+        self.topic_frame = topic_frame
+        self.arrow.configure(text="▾" if topic_frame.expanded else "▸")
+        self.label.configure(text=topic_frame.header_text())
 
-        checkbox = ttk.Checkbutton(
-            frame,
-            text=subtopic_name,
-            variable=var,
-            command=lambda: self.on_checkbox_click(subtopic_name, var),
+
+class SubtopicRow(ttk.Frame):
+    def __init__(self, parent):
+        super().__init__(parent, style="Topic.TFrame", padding=(20, 2))
+        self.topic_frame = None
+        self.subtopic_name = None
+
+        self.var = tk.BooleanVar()
+        self.checkbox = ttk.Checkbutton(
+            self,
+            variable=self.var,
+            command=lambda: self.topic_frame.on_checkbox_click(self.subtopic_name, self.var.get()),
             style="Subtopic.TCheckbutton"
         )
-        checkbox.pack(side="left")
+        self.checkbox.pack(side="left")
 
         delete_btn = ttk.Button(
-            frame,
+            self,
             text="x",
-            command=lambda: self.delete_subtopic(subtopic_name, frame),
+            command=lambda: self.topic_frame.delete_subtopic(self.subtopic_name),
             style="Delete.TButton",
             width=3
         )
         delete_btn.pack(side="right")
 
-    def create_add_subtopic_button(self):
+    def show(self, topic_frame, subtopic_name):
+        self.topic_frame = topic_frame
+        self.subtopic_name = subtopic_name
+        self.checkbox.configure(text=subtopic_name)
+        self.var.set(topic_frame.is_completed(subtopic_name))
+
+
+class AddSubtopicRow(ttk.Frame):
+    def __init__(self, parent):
+        super().__init__(parent, style="Topic.TFrame", padding=(0, 10))
+        self.topic_frame = None
+
         add_subtopic_btn = ttk.Button(
-            self.frame,
+            self,
             text="+ Add Subtopic",
-            command=self.add_subtopic,
+            command=lambda: self.topic_frame.add_subtopic(),
             style="AddSubtopic.TButton"
         )
-        add_subtopic_btn.pack(pady=10)
+        add_subtopic_btn.pack()
 
-    def add_subtopic(self):
-        AddDialog("Add Subtopic", "Enter subtopic name:", self.add_subtopic_callback)
+    def show(self, topic_frame, subtopic_name):
+        self.topic_frame = topic_frame
 
-    def add_subtopic_callback(self, subtopic_name):
-        if not subtopic_name:
-            return
 
-        data = self.data_manager.load_data()
-        if subtopic_name not in data[self.subject]["topics"][self.topic_name]["subtopics"]:
-            data[self.subject]["topics"][self.topic_name]["subtopics"][subtopic_name] = {"completed": False}
-            self.data_manager.save_data(data)
-            self.create_subtopic_frame(subtopic_name, {"completed": False})
-            self.update_callback()
-
-    def delete_subtopic(self, subtopic_name, frame):
-        data = self.data_manager.load_data()
-        del data[self.subject]["topics"][self.topic_name]["subtopics"][subtopic_name]
-        self.data_manager.save_data(data)
-        frame.destroy()
-        self.update_callback()
-
-    def on_checkbox_click(self, subtopic_name, var):
-            # Update the completion status of the subtopic
-            data = self.data_manager.load_data()
-            data[self.subject]["topics"][self.topic_name]["subtopics"][subtopic_name]["completed"] = var.get()
-            self.data_manager.save_data(data)
-
-            # Trigger a callback to update the progress circle
-            self.update_callback()
+ROW_CLASSES = {
+    "topic": TopicHeaderRow,
+    "subtopic": SubtopicRow,
+    "add": AddSubtopicRow,
+}
\ No newline at end of file
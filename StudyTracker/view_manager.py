@@ -0,0 +1,73 @@
+from collections import OrderedDict
+
+
+class ViewManager:
+    """
+    Keeps screens alive across navigation. Each view is built once and then
+    swapped in and out with pack/pack_forget. A view is refreshed when it is
+    shown again only if the study data changed while it was hidden.
+
+    A view has a container widget and refresh(); on_show(), on_hide() and
+    destroy() are optional. Views keyed ("subject", name) are kept in an LRU
+    of at most max_subject_views.
+    """
+
+    def __init__(self, data_manager, max_subject_views=3):
+        self.data_manager = data_manager
+        self.max_subject_views = max_subject_views
+        self.views = OrderedDict()  # Least recently shown first
+        self._versions = {}
+        self.current = None
+        self.current_key = None
+
+    def show(self, key, build):
+        """
+        Show the view cached under key, building it with build() the first time
+        """
+        view = self.views.get(key)
+        if self.current is not None and self.current is not view:
+            self.current.container.pack_forget()
+            self._call(self.current, "on_hide")
+            # A visible view keeps itself up to date, so it is current as of now
+            if self.current_key in self.views:
+                self._versions[self.current_key] = self.data_manager.version
+            else:
+                # Discarded while on screen
+                self._call(self.current, "destroy")
+
+        if view is None:
+            view = self.views[key] = build()
+        else:
+            self.views.move_to_end(key)
+            if self._versions[key] != self.data_manager.version:
+                view.refresh()
+        self._versions[key] = self.data_manager.version
+
+        view.container.pack(fill="both", expand=True)
+        view.container.tkraise()
+        self.current = view
+        self.current_key = key
+        self._call(view, "on_show")
+        self._evict()
+        return view
+
+    def discard(self, key):
+        """
+        Drop a cached view, e.g. once its subject has been deleted
+        """
+        view = self.views.pop(key, None)
+        self._versions.pop(key, None)
+        if view is not None and view is not self.current:
+            self._call(view, "destroy")
+
+    def _evict(self):
+        subject_keys = [key for key in self.views if isinstance(key, tuple) and key[0] == "subject"]
+        for key in subject_keys[:max(0, len(subject_keys) - self.max_subject_views)]:
+            if self.views[key] is not self.current:
+                self.discard(key)
+
+    @staticmethod
+    def _call(view, name):
+        method = getattr(view, name, None)
+        if method is not None:
+            method()
@@ -0,0 +1,224 @@
+import tkinter as tk
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from tkinter import ttk
+
+
+def pointer_within(widget):
+    """
+    Whether the mouse pointer is over widget or one of its descendants.
+    <Leave> also fires when the pointer moves onto a child, so handlers use
+    this to tell that apart from really leaving.
+    """
+    try:
+        under = widget.winfo_containing(*widget.winfo_pointerxy())
+    except KeyError:
+        return False  # A window tkinter does not know about, so not one of ours
+    path = str(widget)
+    return under is not None and (str(under) == path or str(under).startswith(path + "."))
+
+
+class VirtualList(ttk.Frame):
+    """
+    Scrollable list that only keeps enough row widgets to fill the viewport.
+    Rows are built with create_row(parent, kind) and pointed at an item with
+    bind_row(row, index). As the list scrolls, rows that leave the view are
+    reused for the items coming into it, so the widget count stays the same
+    however many items there are.
+
+    Items can be of several kinds, given by kind_of(index), each with its own
+    row class and height. Heights are measured from the first row of a kind
+    unless row_height is given. key_of(index) identifies items across
+    refreshes, so changing the items only touches the rows that changed.
+    """
+
+    def __init__(self, container, create_row, bind_row, kind_of=None, key_of=None, row_height=None,
+                 spacing=0, bg="#f0f0f0", **kwargs):
+        super().__init__(container, **kwargs)
+        self.create_row = create_row
+        self.bind_row = bind_row
+        self.kind_of = kind_of or (lambda index: None)
+        self.key_of = key_of or (lambda index: index)
+        self.spacing = spacing
+        self.count = 0
+
+        self.heights = {} if row_height is None else {None: row_height}
+        self._kinds = []
+        self._keys = []
+        self._offsets = [0]  # Top of every item, plus the bottom of the last one
+
+        # Rows on screen by item index as [row, canvas window id, kind, y, needs binding],
+        # and spare rows by kind as (row, canvas window id)
+        self._shown = {}
+        self._free = {}
+        self._width = None
+
+        self.canvas = tk.Canvas(self, bg=bg, highlightthickness=0)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._on_scroll)
+        self.canvas.pack(side="left", fill="both", expand=True)
+
+        self.canvas.bind("<Configure>", self._on_configure)
+        self.canvas.bind("<Enter>", lambda e: self.canvas.bind_all("<MouseWheel>", self._on_mousewheel))
+        self.canvas.bind("<Leave>", self._on_leave)
+
+    def set_count(self, count, changed=None):
+        """
+        Change the number of items, see refresh()
+        """
+        self.count = count
+        self.refresh(changed)
+
+    def refresh(self, changed=None):
+        """
+        Re-read the items after they changed. Visible rows are matched to
+        items by key: a row whose item is still there keeps its widget and
+        is only rebound if its key is in changed (every key when changed is
+        None). The item at the top of the view stays in place.
+        """
+        anchor = self._anchor()
+        shown = {self._keys[index]: entry for index, entry in self._shown.items()}
+
+        self._layout()
+        position = {key: index for index, key in enumerate(self._keys)} if shown else {}
+        changed = None if changed is None else set(changed)
+
+        self._shown = {}
+        for key, entry in shown.items():
+            index = position.get(key)
+            if index is None or self._kinds[index] != entry[2]:
+                self._release(entry)
+                continue
+            if changed is None or key in changed:
+                entry[4] = True
+            self._shown[index] = entry
+
+        if anchor is not None and anchor[0] in position:
+            key, delta = anchor
+            self.canvas.yview_moveto((self._offsets[position[key]] + delta) / max(1, self._offsets[-1]))
+        self._render()
+
+    def extend(self, count):
+        """
+        Add count items after the existing ones. Items already in the list
+        keep their rows and positions, so only the new items are laid out.
+        """
+        new = range(self.count, self.count + count)
+        self.count += count
+        kinds = [self.kind_of(index) for index in new]
+        self._kinds.extend(kinds)
+        self._keys.extend(self.key_of(index) for index in new)
+        strides = self._measure(kinds)
+        self._offsets.extend(list(accumulate((strides[kind] for kind in kinds), initial=self._offsets[-1]))[1:])
+        self._update_scrollregion(strides)
+        self._render()
+
+    def scroll_to(self, index):
+        """
+        Scroll so the item at index is at the top of the view
+        """
+        if 0 <= index < self.count:
+            self.canvas.yview_moveto(self._offsets[index] / max(1, self._offsets[-1]))
+            self._render()
+
+    def _anchor(self):
+        # Key of the topmost visible item and how far the view is scrolled into it
+        if not self._keys:
+            return None
+        top = self.canvas.canvasy(0)
+        index = min(len(self._keys) - 1, max(0, bisect_right(self._offsets, top) - 1))
+        return self._keys[index], top - self._offsets[index]
+
+    def _new_row(self, kind):
+        row = self.create_row(self.canvas, kind)
+        window = self.canvas.create_window(0, 0, window=row, anchor="nw", state="hidden")
+        if self._width is not None:
+            self.canvas.itemconfigure(window, width=self._width)
+        return row, window
+
+    def _release(self, entry):
+        row, window, kind = entry[:3]
+        self.canvas.itemconfigure(window, state="hidden")
+        self._free.setdefault(kind, []).append((row, window))
+
+    def _layout(self):
+        self._kinds = [self.kind_of(index) for index in range(self.count)]
+        self._keys = [self.key_of(index) for index in range(self.count)]
+        strides = self._measure(self._kinds)
+        self._offsets = [0, *accumulate(strides[kind] for kind in self._kinds)]
+        self._update_scrollregion(strides)
+
+    def _measure(self, kinds):
+        # Return the height plus spacing of every kind, measuring new kinds first
+        for kind in set(kinds) - set(self.heights):
+            # Build the first row of a kind up front to learn its height
+            row, window = self._new_row(kind)
+            row.update_idletasks()
+            self.heights[kind] = row.winfo_reqheight()
+            self._free.setdefault(kind, []).append((row, window))
+        return {kind: height + self.spacing for kind, height in self.heights.items()}
+
+    def _update_scrollregion(self, strides):
+        self.canvas.configure(scrollregion=(0, 0, self.canvas.winfo_width(), self._offsets[-1]),
+                              yscrollincrement=min(strides.values(), default=0))
+
+    def _render(self):
+        top = self.canvas.canvasy(0)
+        first = max(0, bisect_right(self._offsets, top) - 1)
+        end = min(self.count, bisect_left(self._offsets, top + self.canvas.winfo_height()))
+        needed = range(first, end)
+
+        # Give back rows that left the view
+        for index in list(self._shown):
+            if index not in needed:
+                self._release(self._shown.pop(index))
+
+        for index in needed:
+            entry = self._shown.get(index)
+            if entry is None:
+                kind = self._kinds[index]
+                spare = self._free.get(kind)
+                row, window = spare.pop() if spare else self._new_row(kind)
+                entry = self._shown[index] = [row, window, kind, None, True]
+                self.canvas.itemconfigure(window, state="normal")
+            if entry[4]:
+                self.bind_row(entry[0], index)
+                entry[4] = False
+            if entry[3] != self._offsets[index]:
+                entry[3] = self._offsets[index]
+                self.canvas.coords(entry[1], 0, entry[3])
+
+    def _on_configure(self, event):
+        if event.width != self._width:
+            self._width = event.width
+            for row, window, *_ in self._shown.values():
+                self.canvas.itemconfigure(window, width=event.width)
+            for spare in self._free.values():
+                for row, window in spare:
+                    self.canvas.itemconfigure(window, width=event.width)
+            self.canvas.configure(scrollregion=(0, 0, event.width, self._offsets[-1]))
+        self._render()
+
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if float(first) <= 0 and float(last) >= 1:
+            # Hide scrollbar when all content is visible
+            self.scrollbar.pack_forget()
+        else:
+            self.scrollbar.pack(side="right", fill="y")
+        self._render()
+
+    def _on_leave(self, event):
+        # The canvas also gets <Leave> when the pointer moves onto one of its
+        # rows; keep scrolling unless the pointer really left the list
+        if not pointer_within(self.canvas):
+            self.canvas.unbind_all("<MouseWheel>")
+
+    def _on_mousewheel(self, event):
+        # Get current scroll position
+        current_pos = self.canvas.yview()
+        if event.delta > 0 and current_pos[0] <= 0:  # At the top
+            return
+        if event.delta < 0 and current_pos[1] >= 1:  # At the bottom
+            return
+        self.canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")